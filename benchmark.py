@@ -0,0 +1,310 @@
+# Scaling benchmarks for the FCFS, SJF and Round Robin engines in scheduler-gpt.py.
+# To run this code: python benchmark.py [--sizes 1000,10000] [--output results.json]
+# Compare two runs with: python benchmark.py --compare old.json new.json
+# Service throughput: python benchmark.py --service [--clients 4] [--requests 200] [--min-rps 1000]
+
+import sys
+import os
+import argparse
+import http.client
+import importlib.util
+import json
+import platform
+import random
+import re
+import resource
+import subprocess
+import threading
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from time import perf_counter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+ENGINES = ["fcfs", "sjf", "rr"]
+HORIZONS = ["short", "long"]
+ARRIVALS = ["dense", "sparse"]
+MEAN_BURST = 10
+
+# Mean gap between arrivals, as a multiple of the mean burst. Dense arrivals
+# overload the CPU and build long ready queues; sparse ones leave it idle.
+ARRIVAL_GAP = {"dense": 0.5, "sparse": 4.0}
+
+
+def load_scheduler():
+    """Imports scheduler-gpt.py, whose file name is not a valid module name."""
+    if "scheduler_gpt" in sys.modules:
+        return sys.modules["scheduler_gpt"]
+    spec = importlib.util.spec_from_file_location("scheduler_gpt", os.path.join(HERE, "scheduler-gpt.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["scheduler_gpt"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_workload(sched, size, horizon, arrivals, quantum, seed):
+    """
+    Builds a synthetic workload in memory. A short horizon ends the run at
+    half of the total work, so the queue never drains; a long horizon runs
+    well past the last completion.
+    """
+    rng = random.Random(f"{seed}-{size}-{arrivals}")
+    mean_gap = MEAN_BURST * ARRIVAL_GAP[arrivals]
+
+    names = [sys.intern(f"P{i}") for i in range(size)]
+    arrival = array("q")
+    burst = array("q")
+    t = 0.0
+    for _ in range(size):
+        t += rng.expovariate(1 / mean_gap)
+        arrival.append(int(t))
+        burst.append(rng.randint(1, 2 * MEAN_BURST - 1))
+
+    total_burst = sum(burst)
+    if horizon == "short":
+        runfor = max(1, total_burst // 2)
+    else:
+        runfor = 2 * (arrival[-1] + total_burst)
+    return sched.Workload(size, runfor, "rr", quantum, names, arrival, burst)
+
+
+def run_engine(sched, engine, workload, emit):
+    if engine == "fcfs":
+        sched.fifo_scheduler(workload.table(), workload.runfor, emit)
+    elif engine == "sjf":
+        sched.sjf_preemptive_scheduler(workload.table(), workload.runfor, emit)
+    else:
+        scheduler = sched.RoundRobinScheduler(None, workload)
+        scheduler._run_round_robin(emit)
+
+
+def run_case(case):
+    """
+    Runs one benchmark case. Called in a fresh process so the reported
+    maximum RSS belongs to this case alone.
+    """
+    sched = load_scheduler()
+    workload = make_workload(sched, case["size"], case["horizon"], case["arrivals"], case["quantum"], case["seed"])
+
+    # Every run of the case writes to the same null file
+    with open(os.devnull, "w") as devnull:
+        if case["render"]:
+            # Full text path, with idle spans so sparse runs stay bounded
+            def make_emit():
+                log = sched.EventLog(devnull, case["engine"], workload.names, idle_spans=True)
+                return log.emit, None
+        else:
+            def make_emit():
+                counter = sched.EventCounter()
+                return counter.emit, counter
+
+        times = []
+        counter = None
+        for _ in range(case["repeat"]):
+            emit, counter = make_emit()
+            started = perf_counter()
+            run_engine(sched, case["engine"], workload, emit)
+            times.append(perf_counter() - started)
+
+        result = dict(case)
+        wall = min(times)
+        result["wall_seconds"] = wall
+        result["runfor"] = workload.runfor
+        result["ticks_per_second"] = workload.runfor / wall if wall > 0 else None
+        if counter is not None:
+            result["events"] = sum(counter.counts)
+            result["dispatches"] = counter.counts[sched.SELECTED]
+
+        if case["memory"]:
+            # A separate run, since tracing allocations slows the engine down
+            emit, _ = make_emit()
+            tracemalloc.start()
+            run_engine(sched, case["engine"], workload, emit)
+            result["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    result["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+def workload_text(workload):
+    """The workload in the .in syntax, as a request body for the service."""
+    lines = [f"processcount {workload.process_count}", f"runfor {workload.runfor}", "use rr",
+             f"quantum {workload.quantum}"]
+    lines.extend(
+        f"process name {name} arrival {arrival} burst {burst}"
+        for name, arrival, burst in zip(workload.names, workload.arrivals, workload.bursts)
+    )
+    return ("\n".join(lines) + "\nend\n").encode()
+
+
+def service_throughput(jobs, clients, requests, size, quantum, seed):
+    """
+    Starts scheduler-gpt.py --serve and has clients keep-alive connections
+    each POST requests small workloads of size jobs, one after another.
+    Returns the requests served per second.
+    """
+    sched = load_scheduler()
+    body = workload_text(make_workload(sched, size, "long", "dense", quantum, seed))
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "scheduler-gpt.py"), "--serve", "127.0.0.1:0", "--jobs", str(jobs)],
+        stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        port = int(re.search(r"(\d+)\)$", server.stderr.readline().strip()).group(1))
+        failures = []
+
+        def client():
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            try:
+                for _ in range(requests):
+                    connection.request("POST", "/simulate", body)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        failures.append(response.status)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        started = perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = perf_counter() - started
+    finally:
+        server.terminate()
+        server.communicate()
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} requests failed, e.g. with status {failures[0]}")
+    return {
+        "jobs": jobs,
+        "clients": clients,
+        "requests": clients * requests,
+        "size": size,
+        "wall_seconds": wall,
+        "requests_per_second": clients * requests / wall,
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def case_key(result):
+    return (result["engine"], result["size"], result["horizon"], result["arrivals"])
+
+
+def compare(old_file, new_file):
+    with open(old_file) as f:
+        old = {case_key(r): r for r in json.load(f)["results"]}
+    with open(new_file) as f:
+        new = {case_key(r): r for r in json.load(f)["results"]}
+
+    print(f"{'engine':>6} {'size':>8} {'horizon':>7} {'arrivals':>8} {'old s':>9} {'new s':>9} {'speedup':>8}")
+    for key in sorted(old.keys() & new.keys()):
+        before = old[key]["wall_seconds"]
+        after = new[key]["wall_seconds"]
+        speedup = before / after if after > 0 else float("inf")
+        print(f"{key[0]:>6} {key[1]:>8} {key[2]:>7} {key[3]:>8} {before:>9.3f} {after:>9.3f} {speedup:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler engines on synthetic workloads.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated job counts")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="comma-separated subset of fcfs,sjf,rr")
+    parser.add_argument("--horizons", default=",".join(HORIZONS), help="comma-separated subset of short,long")
+    parser.add_argument("--arrivals", default=",".join(ARRIVALS), help="comma-separated subset of dense,sparse")
+    parser.add_argument("--quantum", type=int, default=50, help="Round Robin quantum")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per case; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--render", action="store_true", help="also format the text log (written to /dev/null)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    parser.add_argument("--service", action="store_true",
+                        help="measure the --serve request rate for small workloads instead of the engines")
+    parser.add_argument("--service-jobs", type=int, default=1, help="with --service: worker processes")
+    parser.add_argument("--clients", type=int, default=4, help="with --service: concurrent keep-alive clients")
+    parser.add_argument("--requests", type=int, default=200, help="with --service: requests per client")
+    parser.add_argument("--service-size", type=int, default=20, help="with --service: jobs per request")
+    parser.add_argument("--min-rps", type=float, default=None,
+                        help="with --service: exit with status 1 below this many requests per second")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.service:
+        result = service_throughput(
+            args.service_jobs, args.clients, args.requests, args.service_size, args.quantum, args.seed
+        )
+        print(f"service: {result['requests_per_second']:.0f} requests/s", file=sys.stderr)
+        report = {"commit": git_commit(), "python": platform.python_version(), "service": result}
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+        else:
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        if args.min_rps is not None and result["requests_per_second"] < args.min_rps:
+            sys.exit(1)
+        return
+
+    cases = [
+        {
+            "engine": engine,
+            "size": int(size),
+            "horizon": horizon,
+            "arrivals": arrivals,
+            "quantum": args.quantum,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "render": args.render,
+            "memory": not args.no_memory,
+        }
+        for size in args.sizes.split(",")
+        for horizon in args.horizons.split(",")
+        for arrivals in args.arrivals.split(",")
+        for engine in args.engines.split(",")
+    ]
+
+    results = []
+    for case in cases:
+        # A fresh interpreter per case keeps max RSS readings independent
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            result = executor.submit(run_case, case).result()
+        results.append(result)
+        print(
+            f"{case['engine']:>4} {case['size']:>8} {case['horizon']:>5} {case['arrivals']:>6}: "
+            f"{result['wall_seconds']:8.3f}s",
+            file=sys.stderr,
+        )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
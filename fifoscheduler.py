@@ -1,5 +1,6 @@
 #ChatGPT used for implementation: https://chatgpt.com/share/68d8b0f2-e110-8000-b7dd-7b76757223c5
 #To run this code, call run_fifo_scheduler_from_file with the filename as the argument
+#(pass reference=True to use the original tick-by-tick engine)
 
 import sys
 import os
@@ -56,6 +57,74 @@ def parse_file(filename):
 
 
 def fifo_scheduler(processes, runfor):
+    """
+    First-Come First-Served without the per-tick loop.
+
+    Under FCFS a job starts at max(its arrival, finish of the job before it)
+    and runs to completion, so start and finish times follow directly from
+    the arrival-sorted list in a single pass. Arrival lines are merged into
+    the log in the same order the tick loop produces them.
+    """
+    processes.sort(key=lambda p: p.arrival)
+
+    log_lines = []
+    finished_processes = set()
+
+    # Only arrivals inside [0, runfor) are ever seen by the simulator
+    arrivals = [p for p in processes if 0 <= p.arrival < runfor]
+    next_arrival = 0
+    free = 0  # time at which the CPU is next free
+
+    def log_arrivals_until(time):
+        nonlocal next_arrival
+        while next_arrival < len(arrivals) and arrivals[next_arrival].arrival <= time:
+            p = arrivals[next_arrival]
+            log_lines.append(f"time {p.arrival} : {p.name} arrived")
+            next_arrival += 1
+
+    for p in arrivals:
+        start = max(free, p.arrival)
+        if start >= runfor:
+            break
+
+        # The queue is empty until this job arrives
+        for time in range(free, start):
+            log_lines.append(f"time {time} : Idle")
+
+        log_arrivals_until(start)
+        p.start_time = start
+        log_lines.append(f"time {start} : {p.name} selected (burst {p.remaining})")
+
+        finish = start + p.burst
+        if p.burst <= 0 or finish > runfor:
+            # Still on the CPU when the simulation ends (a job with a
+            # non-positive burst never reaches zero and holds the CPU)
+            p.remaining = p.burst - (runfor - start)
+            free = runfor
+            break
+
+        log_arrivals_until(finish - 1)
+        p.remaining = 0
+        p.finish_time = finish
+        log_lines.append(f"time {finish} : {p.name} finished")
+        finished_processes.add(p.name)
+        free = finish
+
+    for time in range(free, runfor):
+        log_lines.append(f"time {time} : Idle")
+
+    log_arrivals_until(runfor - 1)
+    log_lines.append(f"time {runfor} : Simulator ended")
+
+    unfinished = [p.name for p in processes if p.name not in finished_processes]
+    return log_lines, processes, unfinished
+
+
+def fifo_scheduler_tick(processes, runfor):
+    """
+    Reference FCFS engine that steps the simulation one tick at a time.
+    Kept to cross-check fifo_scheduler; both produce the same log.
+    """
     processes.sort(key=lambda p: p.arrival)
 
     time = 0
@@ -110,14 +179,16 @@ def calculate_metrics(processes):
     return metrics
 
 
-def run_fifo_scheduler_from_file(input_filename):
+def run_fifo_scheduler_from_file(input_filename, reference=False):
     # --- Parse input file ---
     process_count, runfor, algorithm, processes = parse_file(input_filename)
 
     if algorithm != "fcfs":
         print(f"Warning: input requested '{algorithm}', running FIFO instead.", file=sys.stderr)
 
-    log_lines, processes, unfinished = fifo_scheduler(processes, runfor)
+    # reference=True runs the original tick-by-tick loop instead
+    scheduler = fifo_scheduler_tick if reference else fifo_scheduler
+    log_lines, processes, unfinished = scheduler(processes, runfor)
     metrics = calculate_metrics(processes)
 
     # --- Write output file ---
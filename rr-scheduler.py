@@ -97,7 +97,93 @@ class RoundRobinScheduler:
     def _run_round_robin(self):
         """
         Simulates the Round Robin (RR) scheduling algorithm.
-        This method handles process arrivals, preemption, and execution.
+        This method handles process arrivals, preemption, and execution,
+        advancing time from one arrival, completion or quantum expiry to
+        the next, so the cost scales with dispatches rather than run_for.
+        """
+        ready_queue = deque()
+        finished_processes = []
+        current_process = None
+        quantum_counter = 0
+        
+        process_idx = 0
+        raw_logs = []
+        
+        # Time only has to stop at ticks where something can change: an
+        # arrival, the running process finishing or using up its quantum.
+        # Everything in between is applied in one step.
+        time = 0
+        while time < self.run_for:
+            # Check for a process finishing at the beginning of this time tick
+            if current_process and current_process.remaining_time == 0:
+                current_process.finish_time = time
+                current_process.turnaround_time = current_process.finish_time - current_process.arrival_time
+                current_process.wait_time = current_process.turnaround_time - current_process.burst_time
+                raw_logs.append((2, time, f"Time {time:3d} : {current_process.name} finished"))
+                finished_processes.append(current_process)
+                current_process = None
+                quantum_counter = 0
+
+            # Check for new arrivals at the current time tick
+            while process_idx < len(self.processes) and self.processes[process_idx].arrival_time == time:
+                p = self.processes[process_idx]
+                raw_logs.append((1, time, f"Time {time:3d} : {p.name} arrived"))
+                ready_queue.append(p)
+                process_idx += 1
+            
+            # Preemption logic for the current process
+            if current_process and quantum_counter == self.quantum:
+                ready_queue.append(current_process)
+                current_process = None
+                quantum_counter = 0
+            
+            # Select a new process if the CPU is idle
+            if current_process is None and ready_queue:
+                current_process = ready_queue.popleft()
+                if current_process.start_time == -1:
+                    current_process.start_time = time
+                    current_process.response_time = time - current_process.arrival_time
+                raw_logs.append((3, time, f"Time {time:3d} : {current_process.name} selected (burst {current_process.remaining_time:3d})"))
+            
+            # Next tick with an arrival. A process with a negative arrival
+            # time is never matched and holds back every process after it.
+            next_time = self.run_for
+            if process_idx < len(self.processes) and self.processes[process_idx].arrival_time > time:
+                next_time = min(next_time, self.processes[process_idx].arrival_time)
+
+            # Execute or log Idle
+            if current_process:
+                if current_process.remaining_time > 0:
+                    next_time = min(next_time, time + current_process.remaining_time)
+                if quantum_counter < self.quantum:
+                    next_time = min(next_time, time + self.quantum - quantum_counter)
+                current_process.remaining_time -= next_time - time
+                quantum_counter += next_time - time
+            else:
+                for idle_time in range(time, next_time):
+                    raw_logs.append((4, idle_time, f"Time {idle_time:3d} : Idle"))
+
+            time = next_time
+
+        # Handle any remaining processes after the main simulation loop
+        # This is for the case where a process finishes exactly at run_for.
+        if current_process and current_process.remaining_time == 0:
+            current_process.finish_time = self.run_for
+            current_process.turnaround_time = current_process.finish_time - current_process.arrival_time
+            current_process.wait_time = current_process.turnaround_time - current_process.burst_time
+            raw_logs.append((2, self.run_for, f"Time {self.run_for:3d} : {current_process.name} finished"))
+            finished_processes.append(current_process)
+        
+        # Unfinished processes: any process not in the finished list
+        remaining_processes = [p for p in self.processes if p.remaining_time > 0]
+        
+        return finished_processes, remaining_processes, raw_logs
+
+    def _run_round_robin_tick(self):
+        """
+        Reference Round Robin engine that steps the simulation one tick at
+        a time. Kept to cross-check _run_round_robin; both return the same
+        processes and log entries.
         """
         ready_queue = deque()
         finished_processes = []
@@ -160,7 +246,7 @@ class RoundRobinScheduler:
         
         return finished_processes, remaining_processes, raw_logs
 
-    def run(self):
+    def run(self, reference=False):
         """
         Executes the entire simulation workflow.
         """
@@ -168,7 +254,9 @@ class RoundRobinScheduler:
         
         finished, remaining, raw_logs = [], [], []
         if self.algorithm == 'rr':
-            finished, remaining, raw_logs = self._run_round_robin()
+            # reference=True runs the original tick-by-tick loop instead
+            engine = self._run_round_robin_tick if reference else self._run_round_robin
+            finished, remaining, raw_logs = engine()
         else:
             # Placeholder for other algorithms.
             # You would add other methods like self._run_fcfs() here.
@@ -210,10 +298,10 @@ class RoundRobinScheduler:
             for p in remaining_processes:
                 f.write(f"{p.name} did not finish\n")
 
-def simulate_round_robin_scheduler(filename):
+def simulate_round_robin_scheduler(filename, reference=False):
     """
     Main function to run the scheduling simulation.
     This function will be used to test the scheduler.
     """
     scheduler = RoundRobinScheduler(filename)
-    scheduler.run()
\ No newline at end of file
+    scheduler.run(reference)
\ No newline at end of file
@@ -8,22 +8,1090 @@ Samantha Quan
 
 import sys
 import os
+import argparse
+import asyncio
+import bisect
+import bz2
+import csv
+import glob
+import gzip
+import hashlib
+import heapq
+import json
+import lzma
+import math
+import mmap
+import pickle
+import random
+import shutil
+import signal
+import struct
+from array import array
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import accumulate, repeat
+from multiprocessing import Pipe, shared_memory
+from multiprocessing.sharedctypes import RawArray
+from time import perf_counter, process_time
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+# Process table shared by all three schedulers
+
+UNSET = -1  # start/finish/response of a process that has not got there yet
+
+
+class ProcessTable:
+    """
+    Struct-of-arrays storage for the processes of one simulation run.
+    A process is identified by its position in the .in file; names are
+    interned once and every numeric attribute lives in a typed array.
+    """
+    def __init__(self, names, arrival, burst, order=None):
+        self.names = names
+        self.arrival = arrival
+        self.burst = burst
+        self.order = order
+        self.remaining = array("q")
+        self.remaining.frombytes(memoryview(burst).cast("B"))  # burst may be mapped from a .inb file
+        self.start = array("q", [UNSET]) * len(burst)
+        self.finish = array("q", [UNSET]) * len(burst)
+        self.response = array("q", [UNSET]) * len(burst)
+
+    def __len__(self):
+        return len(self.burst)
+
+    def arrival_order(self):
+        """Process ids sorted by arrival time, ties kept in file order."""
+        if self.order is not None:
+            return self.order
+        return sorted(range(len(self)), key=self.arrival.__getitem__)
+
+
+class ProcessView:
+    """
+    Read-only view of one row of a ProcessTable, so code written against
+    the old per-process objects keeps working.
+    """
+    __slots__ = ("table", "pid")
+
+    def __init__(self, table, pid):
+        self.table = table
+        self.pid = pid
+
+    @property
+    def name(self):
+        return self.table.names[self.pid]
+
+
+def _unset_to_none(value):
+    return None if value == UNSET else value
+
+# Workload parsing shared by all three schedulers
+
+class WorkloadError(Exception):
+    """Raised when a .in file is missing or malformed."""
+
+
+class Workload:
+    """A parsed and validated .in file."""
+    def __init__(self, process_count, runfor, algorithm, quantum, names, arrivals, bursts):
+        self.process_count = process_count
+        self.runfor = runfor
+        self.algorithm = algorithm
+        self.quantum = quantum
+        # Process columns in file order
+        self.names = names
+        self.arrivals = arrivals
+        self.bursts = bursts
+        self.order = None  # arrival order, if already known
+
+    def table(self):
+        """Returns a fresh ProcessTable for one simulation run."""
+        return ProcessTable(self.names, self.arrivals, self.bursts, self.order)
+
+    def __getstate__(self):
+        # Columns mapped from a .inb file cannot be pickled; send copies
+        state = dict(self.__dict__)
+        if not isinstance(self.names, list):
+            state["names"] = list(self.names)
+        for column in ("arrivals", "bursts"):
+            if not isinstance(state[column], array):
+                values = array("q")
+                values.frombytes(memoryview(state[column]).cast("B"))
+                state[column] = values
+        return state
+
+
+# Range of the int64 process columns
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+def _parse_error(message):
+    raise WorkloadError(message)
+
+
+def _parse_int(token, parameter):
+    try:
+        return int(token)
+    except ValueError:
+        _parse_error(f"Invalid {parameter} value")
+
+
+def _parse_process(tokens):
+    # Example: process name A arrival 0 burst 5
+    values = {}
+    for key in ("name", "arrival", "burst"):
+        if key not in tokens:
+            _parse_error(f"Missing parameter {key}")
+        index = tokens.index(key) + 1
+        if index >= len(tokens) or tokens[index] in {"name", "arrival", "burst"}:
+            _parse_error(f"Missing parameter {key}")
+        values[key] = tokens[index]
+
+    arrival = _parse_int(values["arrival"], "arrival")
+    burst = _parse_int(values["burst"], "burst")
+    return values["name"], arrival, burst
+
+
+def parse_workload(lines):
+    """
+    Parses .in directives from any iterable of lines in a single pass.
+    Directives may appear in any order; anything after 'end' is ignored.
+    """
+    process_count = None
+    runfor = None
+    algorithm = None
+    quantum = None
+    names = []
+    arrivals = array("q")
+    bursts = array("q")
+    late = {}  # process id -> arrival too large for the int64 column
+
+    for number, line in enumerate(lines, 1):
+        tokens = line.split()
+        if not tokens or tokens[0].startswith("#"):
+            continue
+
+        directive = tokens[0]
+        if directive in {"processcount", "runfor", "quantum", "use"}:
+            if len(tokens) < 2:
+                _parse_error(f"Missing parameter {directive}")
+
+        if directive == "processcount":
+            process_count = _parse_int(tokens[1], directive)
+        elif directive == "runfor":
+            runfor = _parse_int(tokens[1], directive)
+        elif directive == "quantum":
+            quantum = _parse_int(tokens[1], directive)
+        elif directive == "use":
+            algorithm = tokens[1].lower()
+        elif directive == "process":
+            name, arrival, burst = _parse_process(tokens)
+            if arrival < INT64_MIN:
+                _parse_error(f"arrival value out of range on line {number}")
+            if not INT64_MIN <= burst <= INT64_MAX:
+                _parse_error(f"burst value out of range on line {number}")
+            if arrival > INT64_MAX:
+                late[len(names)] = arrival
+                arrival = INT64_MAX
+            names.append(sys.intern(name))
+            arrivals.append(arrival)
+            bursts.append(burst)
+        elif directive == "end":
+            break
+
+    if process_count is None:
+        _parse_error("Missing parameter processcount")
+    if runfor is None:
+        _parse_error("Missing parameter runfor")
+    if algorithm is None:
+        _parse_error("Missing parameter use")
+    if algorithm not in {"fcfs", "sjf", "rr"}:
+        _parse_error(f"Unsupported algorithm '{algorithm}'")
+    if algorithm == "rr" and quantum is None:
+        _parse_error("Missing quantum parameter when use is 'rr'")
+    if process_count != len(names):
+        _parse_error("processcount does not match number of processes defined")
+    if late:
+        _renumber_late_arrivals(arrivals, late, runfor)
+
+    return Workload(process_count, runfor, algorithm, quantum, names, arrivals, bursts)
+
+
+def _renumber_late_arrivals(arrivals, late, runfor):
+    """
+    Fits arrivals beyond int64 into the column. A process arriving after
+    runfor never runs, so only the order of those arrivals matters (FCFS
+    lists unfinished processes by arrival): they are renumbered runfor + 1,
+    runfor + 2, ... in their original order, ties kept.
+    """
+    original = [late.get(i, arrival) for i, arrival in enumerate(arrivals)]
+    never = sorted({arrival for arrival in original if arrival > runfor})
+    if runfor + len(never) > INT64_MAX:
+        _parse_error("runfor value out of range")
+    renumbered = {arrival: runfor + 1 + rank for rank, arrival in enumerate(never)}
+    for i, arrival in enumerate(original):
+        if arrival > runfor:
+            arrivals[i] = renumbered[arrival]
+
+
+def load_workload(filename):
+    """
+    Reads a .in file line by line and returns the parsed Workload. Binary
+    .inb files are memory-mapped instead. Compressed files (.in.gz,
+    .inb.xz, ...) are decompressed as they are read.
+    """
+    base, compression = split_compression(filename)
+    binary = base.endswith(BINARY_EXTENSION)
+    if binary and not compression:
+        return load_binary_workload(filename)
+    try:
+        with open_file(filename, "rb" if binary else "r") as f:
+            if binary:
+                # A compressed .inb cannot be mapped, so it is read into memory
+                return _workload_from_buffer(memoryview(f.read()), filename)
+            return parse_workload(f)
+    except FileNotFoundError:
+        raise WorkloadError(f"File not found: {filename}")
+    except (OSError, EOFError, lzma.LZMAError) as e:
+        raise WorkloadError(f"Cannot read {filename}: {e}")
+
+# Compressed input and output
+#
+# A file whose name ends in one of COMPRESSORS is compressed: workloads
+# (x.in.gz) are decompressed while they are parsed, and the .out file and
+# any other output of the run is written compressed the same way
+# (x.out.gz). zstd is only available on Python 3.14+ or with the
+# zstandard package installed.
+
+COMPRESSORS = {".gz": gzip.open, ".xz": lzma.open, ".bz2": bz2.open}
+if zstd is not None:
+    COMPRESSORS[".zst"] = zstd.open
+
+# Levels used when writing. The defaults of gzip (9) and xz (6) are several
+# times slower than the simulation on a large log, for little gain.
+COMPRESS_OPTIONS = {".gz": {"compresslevel": 6}, ".xz": {"preset": 0}}
+
+
+def split_compression(filename):
+    """Splits the compression suffix off filename: x.in.gz -> ("x.in", ".gz")."""
+    base, suffix = os.path.splitext(filename)
+    if suffix in COMPRESSORS:
+        return base, suffix
+    return filename, ""
+
+
+def workload_extension(filename):
+    """The extension of a workload file, ignoring compression: .in for x.in.gz."""
+    return os.path.splitext(split_compression(filename)[0])[1]
+
+
+def open_file(filename, mode="r", **kwargs):
+    """
+    open() that compresses or decompresses files named with a COMPRESSORS
+    suffix. buffering is ignored for those; the compressor buffers itself.
+    """
+    compression = split_compression(filename)[1]
+    if not compression:
+        return open(filename, mode, **kwargs)
+    kwargs.pop("buffering", None)
+    if "r" not in mode:
+        kwargs.update(COMPRESS_OPTIONS.get(compression, {}))
+    if "b" not in mode and "t" not in mode:
+        mode += "t"  # the compressors default to binary
+    return COMPRESSORS[compression](filename, mode, **kwargs)
+
+# Binary workload format (.inb)
+#
+# A little-endian header, then three 8-byte aligned int64 columns and the
+# process names:
+#
+#   header       magic, algorithm, has_quantum, processcount, runfor,
+#                quantum, size of the name data
+#   arrivals     processcount int64
+#   bursts       processcount int64
+#   offsets      processcount + 1 int64, name i is data[offsets[i]:offsets[i+1]]
+#   names        UTF-8 name data
+
+BINARY_EXTENSION = ".inb"
+BINARY_MAGIC = b"SCHEDWL1"
+BINARY_HEADER = struct.Struct("<8s4s?3xqqqq")
+
+
+class NameTable:
+    """
+    Process names of a binary workload, decoded from the mapped file on
+    access instead of being built into a list up front.
+    """
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def _int64_column(buffer, offset, count):
+    column = buffer[offset:offset + 8 * count].cast("q")
+    if sys.byteorder != "little":
+        column = array("q", column.tobytes())
+        column.byteswap()
+    return column
+
+
+def _binary_parts(workload):
+    """The .inb encoding of workload, as a list of byte buffers."""
+    encoded = [name.encode("utf-8") for name in workload.names]
+    offsets = array("q", [0])
+    offsets.extend(accumulate(len(name) for name in encoded))
+    names_size = offsets[-1]
+    arrivals = array("q", workload.arrivals)
+    bursts = array("q", workload.bursts)
+    if sys.byteorder != "little":
+        for column in (arrivals, bursts, offsets):
+            column.byteswap()
+
+    quantum = workload.quantum
+    header = BINARY_HEADER.pack(
+        BINARY_MAGIC,
+        workload.algorithm.encode("ascii"),
+        quantum is not None,
+        workload.process_count,
+        workload.runfor,
+        quantum if quantum is not None else 0,
+        names_size,
+    )
+    return [header, arrivals, bursts, offsets] + encoded
+
+
+def write_binary_workload(workload, filename):
+    """Writes workload in the .inb format."""
+    with open_file(filename, "wb") as f:
+        f.writelines(_binary_parts(workload))
+
+
+def load_binary_workload(filename):
+    """
+    Memory-maps a .inb file and returns a Workload whose columns are
+    read-only views of the mapping, so nothing is parsed or copied.
+    """
+    try:
+        with open(filename, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < BINARY_HEADER.size:
+                _parse_error(f"Not a binary workload file: {filename}")
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        raise WorkloadError(f"File not found: {filename}")
+    return _workload_from_buffer(memoryview(data), filename)
+
+
+def _workload_from_buffer(buffer, filename):
+    """Workload over a buffer in the .inb format, without copying its columns."""
+    size = len(buffer)
+    if size < BINARY_HEADER.size:
+        _parse_error(f"Not a binary workload file: {filename}")
+    magic, algorithm, has_quantum, process_count, runfor, quantum, names_size = \
+        BINARY_HEADER.unpack_from(buffer)
+    if magic != BINARY_MAGIC:
+        _parse_error(f"Not a binary workload file: {filename}")
+    algorithm = algorithm.rstrip(b"\0").decode("ascii")
+    if algorithm not in {"fcfs", "sjf", "rr"}:
+        _parse_error(f"Unsupported algorithm '{algorithm}'")
+
+    n = process_count
+    columns_end = BINARY_HEADER.size + 8 * (3 * n + 1)
+    if n < 0 or size != columns_end + names_size:
+        _parse_error(f"Truncated binary workload file: {filename}")
+
+    arrivals = _int64_column(buffer, BINARY_HEADER.size, n)
+    bursts = _int64_column(buffer, BINARY_HEADER.size + 8 * n, n)
+    offsets = _int64_column(buffer, BINARY_HEADER.size + 16 * n, n + 1)
+    names = NameTable(buffer[columns_end:], offsets)
+
+    return Workload(process_count, runfor, algorithm, quantum if has_quantum else None, names, arrivals, bursts)
+
+
+def convert_workload(input_file, output_file=None):
+    """Converts a text .in file to .inb; returns the output file name."""
+    if output_file is None:
+        output_file = os.path.splitext(split_compression(input_file)[0])[0] + BINARY_EXTENSION
+    if os.path.realpath(output_file) == os.path.realpath(input_file):
+        # A .inb input is mapped, not read, so writing it would truncate it
+        raise WorkloadError(f"Cannot convert {input_file} onto itself")
+    workload = load_workload(input_file)
+    write_binary_workload(workload, output_file)
+    return output_file
+
+# Shared-memory workloads for worker processes
+
+class SharedWorkload:
+    """
+    A workload published once in a multiprocessing.shared_memory block,
+    so worker processes attach to it by name instead of each unpickling a
+    copy. The block holds the read-only workload in the .inb layout and
+    its arrival order:
+
+        [.inb workload][pad][order: n]
+
+    Results are not shared; workers simulate into tables of their own and
+    send back what they computed. The publisher creates the block with
+    publish() and removes it with unlink(), or by using it as a context
+    manager; workers pass handle to attach(). close() releases every view
+    of the block, so the workload and tables built from it must not be
+    used after that.
+    """
+    def __init__(self, shm, workload_size, owner=False):
+        self.shm = shm
+        self.workload_size = workload_size
+        self.owner = owner
+        buffer = shm.buf
+        self.workload = _workload_from_buffer(buffer[:workload_size], f"shared memory {shm.name}")
+        n = self.workload.process_count
+        order_offset = -workload_size % 8 + workload_size
+        self.workload.order = buffer[order_offset:order_offset + 8 * n].cast("q")
+
+    @classmethod
+    def publish(cls, workload):
+        """Copies workload into a new shared block."""
+        parts = _binary_parts(workload)
+        workload_size = sum(memoryview(part).nbytes for part in parts)
+        n = workload.process_count
+        order_offset = -workload_size % 8 + workload_size
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, order_offset + 8 * n))
+        try:
+            position = 0
+            for part in parts:
+                part = memoryview(part).cast("B")
+                shm.buf[position:position + len(part)] = part
+                position += len(part)
+            order = array("q", sorted(range(n), key=workload.arrivals.__getitem__))
+            shm.buf[order_offset:order_offset + 8 * n] = memoryview(order).cast("B")
+            return cls(shm, workload_size, owner=True)
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+
+    @classmethod
+    def attach(cls, handle):
+        name, workload_size = handle
+        return cls(shared_memory.SharedMemory(name=name), workload_size)
+
+    @property
+    def handle(self):
+        """Small picklable reference to the block, for attach()."""
+        return (self.shm.name, self.workload_size)
+
+    def table(self):
+        """A fresh ProcessTable over the shared workload, with private result columns."""
+        return self.workload.table()
+
+    def close(self):
+        workload = self.workload
+        if workload is not None:
+            # The mapping cannot close while views of it exist, and tables
+            # built from the workload share them, so release them here
+            # rather than wait for every table to be collected
+            self.workload = None
+            names = workload.names
+            for view in (workload.arrivals, workload.bursts, workload.order, names.data, names.offsets):
+                if isinstance(view, memoryview):
+                    view.release()
+        self.shm.close()
+
+    def unlink(self):
+        self.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.unlink()
+
+# Scheduling events, written to the output file as they happen
+
+ARRIVED, SELECTED, PREEMPTED, FINISHED, IDLE = range(5)
+EVENT_NAMES = ("arrived", "selected", "preempted", "finished", "idle")
+
+# Log line formats per algorithm, indexed by event; preemptions are not
+# part of the text log
+LOG_FORMATS = {
+    "fcfs": (
+        "time {0} : {1} arrived",
+        "time {0} : {1} selected (burst {2})",
+        None,
+        "time {0} : {1} finished",
+        "time {0} : Idle",
+    ),
+    "sjf": (
+        "Time {0:3} : {1} arrived",
+        "Time {0:3} : {1} selected (burst {2:3})",
+        None,
+        "Time {0:3} : {1} finished",
+        "Time {0:3} : Idle",
+    ),
+}
+LOG_FORMATS["rr"] = LOG_FORMATS["sjf"]
+# Multi-CPU runs tag each line with the CPU ({3}) the event happened on
+LOG_FORMATS["smp"] = (
+    "Time {0:3} : {1} arrived",
+    "Time {0:3} : CPU {3} : {1} selected (burst {2:3})",
+    None,
+    "Time {0:3} : CPU {3} : {1} finished",
+    "Time {0:3} : CPU {3} : Idle",
+)
+
+# Single-line form of an idle span, used when idle_spans is enabled
+IDLE_SPAN_FORMATS = {
+    "fcfs": "time {0} : Idle until {2}",
+    "sjf": "Time {0:3} : Idle until {2:3}",
+}
+IDLE_SPAN_FORMATS["rr"] = IDLE_SPAN_FORMATS["sjf"]
+IDLE_SPAN_FORMATS["smp"] = "Time {0:3} : CPU {3} : Idle until {2:3}"
+
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+
+def open_output(filename, position=None):
+    """
+    Opens an output file for writing. With a position from an earlier
+    tell(), the existing file is cut back to that point and appended to.
+    """
+    if position is None:
+        return open_file(filename, "w", buffering=OUTPUT_BUFFER_SIZE)
+    f = open(filename, "r+", buffering=OUTPUT_BUFFER_SIZE)
+    f.seek(position)
+    f.truncate()
+    return f
+
+
+class EventLog:
+    """
+    Formats scheduling events and writes them straight to a buffered
+    output file, so the log is never held in memory.
+
+    Events name processes by their id in the ProcessTable (-1 for none),
+    and multi-CPU engines also pass the CPU. Engines report idle time as
+    one IDLE event per span, with the end of the span as its value. By
+    default the span is written as one Idle line per tick; with
+    idle_spans=True it is written as a single line.
+    """
+    def __init__(self, f, algorithm, names, idle_spans=False):
+        self.f = f
+        self.names = names
+        self.formats = [fmt + "\n" if fmt else None for fmt in LOG_FORMATS[algorithm]]
+        self.idle_spans = idle_spans
+        self.idle_span_format = IDLE_SPAN_FORMATS[algorithm] + "\n"
+
+    def emit(self, time, event, job=-1, value=0, cpu=-1):
+        if event == IDLE:
+            if self.idle_spans:
+                self.f.write(self.idle_span_format.format(time, None, value, cpu))
+            else:
+                fmt = self.formats[IDLE]
+                self.f.writelines(fmt.format(t) for t in range(time, value))
+            return
+
+        fmt = self.formats[event]
+        if fmt is not None:
+            self.f.write(fmt.format(time, self.names[job], value, cpu))
+
+class EventCounter:
+    """
+    Counts events by type. Used in place of an EventLog when only the
+    metrics of a run are needed.
+    """
+    def __init__(self):
+        self.counts = [0] * 5
+
+    def emit(self, time, event, job=-1, value=0, cpu=-1):
+        self.counts[event] += 1
+
+def chain_sinks(emit, *sinks):
+    """
+    Returns an emit that hands every event to each of sinks, last first,
+    and then to emit. A sink is any object with an emit method; None
+    stands for one that is switched off. This is how the engines add
+    --profile, --stats, --trace and --format to their EventLog.
+    """
+    for sink in sinks:
+        if sink is not None:
+            emit = _chained(sink.emit, emit)
+    return emit
+
+
+def _chained(first, then):
+    def chained(time, event, job=-1, value=0, cpu=-1):
+        first(time, event, job, value, cpu)
+        then(time, event, job, value, cpu)
+    return chained
+
+# Profiling, enabled with --profile
+
+class ProfilingSink:
+    """
+    Passes events through to an EventLog while keeping the counters
+    reported by --profile. The ready-queue length is derived from the
+    event stream: arrivals join it, dispatches leave it and preemptions
+    rejoin it. Lines are counted as the log writes them: none for an
+    event without a format, and one per tick of an idle span unless the
+    log writes spans as single lines.
+    """
+    def __init__(self, log):
+        self.inner = log.emit
+        self.logged = [fmt is not None for fmt in log.formats]
+        self.idle_spans = log.idle_spans
+        self.counts = [0] * 5
+        self.lines = 0
+        self.queue_length = 0
+        self.max_queue_length = 0
+        self.idle_ticks = 0
+
+    def emit(self, time, event, job=-1, value=0, cpu=-1):
+        self.counts[event] += 1
+        if event == IDLE:
+            self.lines += 1 if self.idle_spans else max(value - time, 0)
+        elif self.logged[event]:
+            self.lines += 1
+        if event == ARRIVED or event == PREEMPTED:
+            self.queue_length += 1
+            if self.queue_length > self.max_queue_length:
+                self.max_queue_length = self.queue_length
+        elif event == SELECTED:
+            self.queue_length -= 1
+        elif event == IDLE:
+            self.idle_ticks += value - time
+        self.inner(time, event, job, value, cpu)
+
+
+class Profiler:
+    """
+    Wall and CPU time per phase of a run, plus scheduler counters taken
+    from the event stream.
+    """
+    def __init__(self):
+        self.phases = []  # (name, wall seconds, cpu seconds)
+        self.counters = {}
+        self.sink = None
+
+    @contextmanager
+    def phase(self, name):
+        wall, cpu = perf_counter(), process_time()
+        try:
+            yield
+        finally:
+            self.phases.append((name, perf_counter() - wall, process_time() - cpu))
+
+    def wrap(self, log):
+        """Returns an emit that counts events before passing them on to log."""
+        self.sink = ProfilingSink(log)
+        return self.sink.emit
+
+    def results(self):
+        counters = dict(self.counters)
+        if self.sink is not None:
+            counts = self.sink.counts
+            counters["dispatches"] = counts[SELECTED]
+            counters["preemptions"] = counts[PREEMPTED]
+            counters["max_ready_queue"] = self.sink.max_queue_length
+            counters["idle_ticks"] = self.sink.idle_ticks
+            counters["events_logged"] = self.sink.lines
+        return {
+            "phases": [{"phase": name, "wall": wall, "cpu": cpu} for name, wall, cpu in self.phases],
+            "counters": counters,
+        }
+
+    def report(self, out=sys.stderr):
+        results = self.results()
+        print(f"{'phase':<10} {'wall ms':>10} {'cpu ms':>10}", file=out)
+        for row in results["phases"]:
+            print(f"{row['phase']:<10} {row['wall'] * 1000:>10.2f} {row['cpu'] * 1000:>10.2f}", file=out)
+        wall = sum(row["wall"] for row in results["phases"])
+        cpu = sum(row["cpu"] for row in results["phases"])
+        print(f"{'total':<10} {wall * 1000:>10.2f} {cpu * 1000:>10.2f}", file=out)
+        for name, value in results["counters"].items():
+            print(f"{name.replace('_', ' '):<16} {value:>14}", file=out)
+
+    def write_json(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.results(), f, indent=2)
+            f.write("\n")
+
+
+class NullProfiler:
+    """Stands in for a Profiler when profiling is off; adds no per-event work."""
+    def phase(self, name):
+        return nullcontext()
+
+    def wrap(self, log):
+        return log.emit
+
+
+NULL_PROFILER = NullProfiler()
+
+# Timeline export, enabled with --trace
+
+class TraceWriter:
+    """
+    Event sink that streams a run as Chrome trace-event JSON, in the JSON
+    array format that Perfetto and chrome://tracing both open. Every
+    dispatch and idle stretch is a slice on its CPU's track, arrivals and
+    finishes are instant events, and the ready-queue length is a counter
+    track. One tick is shown as one microsecond.
+
+    A slice is written when it ends, so only the slice running on each
+    CPU is held in memory. close(runfor) ends the slices still running
+    and terminates the array.
+    """
+    def __init__(self, f, names, cpus=1):
+        self.f = f
+        self.names = names
+        self.quoted = {}
+        self.running = {}  # cpu -> (start, job, remaining)
+        self.queue_length = 0
+        self.separator = ""
+        f.write("[\n")
+        self._write('{"name":"process_name","ph":"M","pid":1,"args":{"name":"scheduler"}}')
+        for cpu in range(cpus):
+            self._write(f'{{"name":"thread_name","ph":"M","pid":1,"tid":{cpu},"args":{{"name":"CPU {cpu}"}}}}')
+
+    def _write(self, record):
+        self.f.write(self.separator)
+        self.f.write(record)
+        self.separator = ",\n"
+
+    def _name(self, job):
+        quoted = self.quoted.get(job)
+        if quoted is None:
+            quoted = self.quoted[job] = json.dumps(self.names[job])
+        return quoted
+
+    def _queue(self, time, change):
+        self.queue_length += change
+        self._write(f'{{"name":"ready queue","ph":"C","ts":{time},"pid":1,"args":{{"jobs":{self.queue_length}}}}}')
+
+    def _end_slice(self, cpu, time):
+        running = self.running.pop(cpu, None)
+        if running is not None:
+            start, job, remaining = running
+            self._write(
+                f'{{"name":{self._name(job)},"cat":"run","ph":"X","ts":{start},"dur":{time - start},'
+                f'"pid":1,"tid":{cpu},"args":{{"remaining":{remaining}}}}}'
+            )
+
+    def emit(self, time, event, job=-1, value=0, cpu=-1):
+        cpu = max(cpu, 0)
+        if event == SELECTED:
+            self._end_slice(cpu, time)
+            self.running[cpu] = (time, job, value)
+            self._queue(time, -1)
+        elif event == ARRIVED:
+            self._write(f'{{"name":{self._name(job)},"cat":"arrival","ph":"i","s":"p","ts":{time},"pid":1}}')
+            self._queue(time, 1)
+        elif event == PREEMPTED:
+            self._end_slice(cpu, time)
+            self._queue(time, 1)
+        elif event == FINISHED:
+            self._end_slice(cpu, time)
+            self._write(
+                f'{{"name":{self._name(job)},"cat":"finish","ph":"i","s":"t","ts":{time},"pid":1,"tid":{cpu}}}'
+            )
+        elif value > time:
+            self._write(f'{{"name":"Idle","cat":"idle","ph":"X","ts":{time},"dur":{value - time},"pid":1,"tid":{cpu}}}')
+
+    def close(self, runfor):
+        for cpu in list(self.running):
+            self._end_slice(cpu, runfor)
+        self.f.write("\n]\n")
+
+
+@contextmanager
+def open_trace(filename, names, runfor, cpus=1):
+    """Yields a TraceWriter streaming to filename, or None if filename is None."""
+    if filename is None:
+        yield None
+        return
+    with open_file(filename, "w", buffering=OUTPUT_BUFFER_SIZE) as f:
+        writer = TraceWriter(f, names, cpus)
+        yield writer
+        writer.close(runfor)
+
+# Machine-readable results, enabled with --format
+
+RECORD_FORMATS = ("jsonl", "csv")
+EVENT_FIELDS = ("time", "event", "process", "burst", "until", "cpu")
+JOB_FIELDS = ("process", "arrival", "burst", "start", "finish", "wait", "turnaround", "response", "finished")
+RECORD_CHUNK = 4096  # events collected before they are written out together
+
+# JSON Lines templates, filled with values already converted to JSON
+# literals; far cheaper per record than going through json.dumps
+EVENT_JSONL = "{" + ",".join(f'"{field}":%s' for field in EVENT_FIELDS) + "}\n"
+JOB_JSONL = "{" + ",".join(f'"{field}":%s' for field in JOB_FIELDS) + "}\n"
+
+
+def job_fields(table, i):
+    """Job i's values in JOB_FIELDS order, with None for what it never got to."""
+    start = _unset_to_none(table.start[i])
+    response = _unset_to_none(table.response[i])
+    if table.finish[i] == UNSET:
+        return (table.names[i], table.arrival[i], table.burst[i], start, None, None, None, response, False)
+    turnaround = table.finish[i] - table.arrival[i]
+    return (
+        table.names[i], table.arrival[i], table.burst[i], start, table.finish[i],
+        turnaround - table.burst[i], turnaround, response, True,
+    )
+
+
+class RecordWriter:
+    """
+    Event sink that writes a run as machine-readable records: one per
+    event, preemptions included, to the events file, and one per job in
+    input order, from write_jobs(), to the jobs file. The format is jsonl
+    or csv. Every record has all of EVENT_FIELDS or JOB_FIELDS whatever the
+    algorithm, with null (an empty CSV cell) where a field does not apply,
+    and booleans spelled true/false in both formats, so runs of different
+    algorithms load into the same table. The CLI (--format) and the
+    simulation service both write their records through this class.
+
+    Events are kept as plain tuples and converted and written RECORD_CHUNK
+    at a time.
+    """
+    def __init__(self, format, names, events, jobs):
+        if format not in RECORD_FORMATS:
+            raise ValueError(f"unknown record format '{format}'")
+        self.format = format
+        self.names = names
+        self.events = events
+        self.jobs = jobs
+        self.quoted = {}
+        self.pending = []
+        if format == "csv":
+            csv.writer(events).writerow(EVENT_FIELDS)
+
+    def _quoted(self, job):
+        if job < 0:
+            return "null"
+        quoted = self.quoted.get(job)
+        if quoted is None:
+            quoted = self.quoted[job] = json.dumps(self.names[job])
+        return quoted
+
+    def emit(self, time, event, job=-1, value=0, cpu=-1):
+        self.pending.append((time, event, job, value, cpu))
+        if len(self.pending) >= RECORD_CHUNK:
+            self.flush()
+
+    def flush(self):
+        if self.format == "csv":
+            names = self.names
+            csv.writer(self.events).writerows(
+                (
+                    time, EVENT_NAMES[event], names[job] if job >= 0 else None,
+                    value if event == SELECTED else None, value if event == IDLE else None, cpu if cpu >= 0 else None,
+                )
+                for time, event, job, value, cpu in self.pending
+            )
+        else:
+            quoted = self._quoted
+            self.events.writelines(
+                EVENT_JSONL % (
+                    time, f'"{EVENT_NAMES[event]}"', quoted(job),
+                    value if event == SELECTED else "null", value if event == IDLE else "null",
+                    cpu if cpu >= 0 else "null",
+                )
+                for time, event, job, value, cpu in self.pending
+            )
+        self.pending.clear()
+
+    def write_jobs(self, table):
+        """Writes the job records of a finished run; flushes pending events first."""
+        self.flush()
+        rows = (job_fields(table, i) for i in range(len(table)))
+        if self.format == "csv":
+            writer = csv.writer(self.jobs)
+            writer.writerow(JOB_FIELDS)
+            writer.writerows(row[:-1] + ("true" if row[-1] else "false",) for row in rows)
+        else:
+            self.jobs.writelines(
+                JOB_JSONL % (
+                    (json.dumps(row[0]),)
+                    + tuple("null" if value is None else value for value in row[1:-1])
+                    + ("true" if row[-1] else "false",)
+                )
+                for row in rows
+            )
+
+
+@contextmanager
+def open_records(format, output_file, names):
+    """
+    Yields a RecordWriter for the run writing output_file, or None if
+    format is None. The events and jobs go to BASE.events.FORMAT and
+    BASE.jobs.FORMAT next to output_file, compressed like it.
+    """
+    if format is None:
+        yield None
+        return
+    base, compression = split_compression(output_file)
+    base = os.path.splitext(base)[0]
+    with open_file(f"{base}.events.{format}{compression}", "w", newline="", buffering=OUTPUT_BUFFER_SIZE) as events, \
+            open_file(f"{base}.jobs.{format}{compression}", "w", newline="", buffering=OUTPUT_BUFFER_SIZE) as jobs:
+        writer = RecordWriter(format, names, events, jobs)
+        yield writer
+        writer.flush()
+
+# Checkpoint and resume
+
+class Checkpoint:
+    """
+    Periodically saves the state of a running engine so an interrupted run
+    can be resumed with byte-identical output.
+
+    A checkpoint holds the engine's loop state (simulated time, queue
+    contents, ...), the dynamic columns of its ProcessTable and the output
+    position the log had been flushed to. Engines call due() at the top of
+    their main loop and save() when it returns True. Checkpoints are taken
+    every every_ticks simulated ticks and/or every_seconds of wall time.
+    """
+    COLUMNS = ("remaining", "start", "finish", "response")
+
+    def __init__(self, path, every_ticks=None, every_seconds=None, resume=False):
+        self.path = path
+        self.every_ticks = every_ticks
+        self.every_seconds = every_seconds
+        self.resume = resume
+        self.key = None  # identifies the workload and options being run
+        self.state = None  # engine state to resume from
+        self.table = None
+        self.f = None
+        self.next_tick = 0
+        self.next_wall = 0.0
+
+    def start(self, table, output_file):
+        """
+        Binds the checkpoint to a run. If resuming from a checkpoint taken
+        for the same workload, restores the table columns and engine state
+        and returns the output position to continue from, else None.
+        """
+        self.table = table
+        self._schedule(0)
+        if not self.resume:
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+            if data["key"] != self.key or os.path.getsize(output_file) < data["position"]:
+                return None
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        for name in self.COLUMNS:
+            getattr(table, name)[:] = data["columns"][name]
+        self.state = data["engine"]
+        self._schedule(data["time"])
+        return data["position"]
+
+    def attach(self, f):
+        """Sets the output file whose position is recorded."""
+        self.f = f
+
+    def due(self, time):
+        if self.every_ticks is not None and time >= self.next_tick:
+            return True
+        return self.every_seconds is not None and perf_counter() >= self.next_wall
+
+    def save(self, time, state):
+        self.f.flush()
+        data = {
+            "key": self.key,
+            "time": time,
+            "position": self.f.tell(),
+            "engine": state,
+            "columns": {name: getattr(self.table, name) for name in self.COLUMNS},
+        }
+        # Write then rename, so a crash mid-save leaves the last checkpoint
+        temp = self.path + ".tmp"
+        with open(temp, "wb") as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, self.path)
+        self._schedule(time)
+
+    def _schedule(self, time):
+        if self.every_ticks is not None:
+            self.next_tick = time + self.every_ticks
+        if self.every_seconds is not None:
+            self.next_wall = perf_counter() + self.every_seconds
+
+    def finish(self):
+        """Removes the checkpoint once the run has completed."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
 
 # Google Gemini used for creation. Link: https://g.co/gemini/share/b862a9784cd1
 
-class RoundRobinProcess:
+class RoundRobinProcess(ProcessView):
     """Represents a process with its attributes specific to Round Robin."""
-    def __init__(self, name, arrival, burst):
-        self.name = name
-        self.arrival_time = arrival
-        self.burst_time = burst
-        self.remaining_time = burst
-        self.start_time = -1
-        self.finish_time = -1
-        self.wait_time = 0
-        self.turnaround_time = 0
-        self.response_time = -1
+    __slots__ = ()
+
+    @property
+    def arrival_time(self):
+        return self.table.arrival[self.pid]
+
+    @property
+    def burst_time(self):
+        return self.table.burst[self.pid]
+
+    @property
+    def remaining_time(self):
+        return self.table.remaining[self.pid]
+
+    @property
+    def start_time(self):
+        return self.table.start[self.pid]
+
+    @property
+    def finish_time(self):
+        return self.table.finish[self.pid]
+
+    @property
+    def turnaround_time(self):
+        if self.finish_time == UNSET:
+            return 0
+        return self.finish_time - self.arrival_time
+
+    @property
+    def wait_time(self):
+        if self.finish_time == UNSET:
+            return 0
+        return self.turnaround_time - self.burst_time
+
+    @property
+    def response_time(self):
+        return self.table.response[self.pid]
 
 class RoundRobinScheduler:
     """
@@ -31,53 +1099,49 @@ class RoundRobinScheduler:
     It reads process data from a file, validates parameters,
     simulates the process execution, and generates a formatted output file.
     """
-    def __init__(self, filename):
+    def __init__(self, filename, workload=None, idle_spans=False, profile=NULL_PROFILER, checkpoint=None,
+                 stats=False, per_job=True, trace=None, records=None):
         self.filename = filename
-        self.processes = []
+        self.idle_spans = idle_spans
+        self.profile = profile
+        self.checkpoint = checkpoint
+        self.stats = stats
+        self.per_job = per_job
+        self.trace = trace
+        self.records = records
+        self.table = None
+        self.order = []  # process ids sorted by arrival time
         self.process_count = -1
         self.run_for = -1
         self.algorithm = None
         self.quantum = -1
-        self.log = []
-        
-        # Parse the input file to populate scheduler attributes
-        self._parse_file()
-        
-    def _parse_file(self):
-        """
-        Parses the input file to extract simulation parameters and process data.
-        Performs basic checks for required parameters.
-        """
-        try:
-            with open(self.filename, 'r') as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            print(f"Error: File not found at '{self.filename}'")
-            sys.exit(1)
 
-        for line in lines:
-            parts = line.strip().split()
-            if not parts:
-                continue
-
-            directive = parts[0]
-            if directive == 'processcount':
-                self.process_count = int(parts[1])
-            elif directive == 'runfor':
-                self.run_for = int(parts[1])
-            elif directive == 'use':
-                self.algorithm = parts[1]
-            elif directive == 'quantum':
-                self.quantum = int(parts[1])
-            elif directive == 'process':
-                name = parts[2]
-                arrival = int(parts[4])
-                burst = int(parts[6])
-                self.processes.append(RoundRobinProcess(name, arrival, burst))
-            elif directive == 'end':
-                break
+        # Parse the input file unless an already-parsed workload was given
+        if workload is None:
+            try:
+                workload = load_workload(filename)
+            except WorkloadError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+        self._load_workload(workload)
 
-        self.processes.sort(key=lambda p: p.arrival_time)
+    def _load_workload(self, workload):
+        """
+        Copies the simulation parameters from a parsed Workload and builds
+        the process table, with the processes ordered by arrival time.
+        """
+        self.process_count = workload.process_count
+        self.run_for = workload.runfor
+        self.algorithm = workload.algorithm
+        if workload.quantum is not None:
+            self.quantum = workload.quantum
+        self.table = workload.table()
+        self.order = self.table.arrival_order()
+
+    @property
+    def processes(self):
+        """The processes in arrival order, as RoundRobinProcess views."""
+        return [RoundRobinProcess(self.table, i) for i in self.order]
 
     def _validate(self):
         """
@@ -96,425 +1160,705 @@ class RoundRobinScheduler:
         if self.algorithm == 'rr' and self.quantum == -1:
             print("Error: Missing quantum parameter when use is 'rr'")
             sys.exit(1)
-        if len(self.processes) != self.process_count:
+        if len(self.order) != self.process_count:
             print("Error: Process count mismatch in file")
             sys.exit(1)
-            
-    def _run_round_robin(self):
+
+    def _run_round_robin(self, emit, checkpoint=None):
         """
         Simulates the Round Robin (RR) scheduling algorithm.
-        This method handles process arrivals, preemption, and execution.
+        This method handles process arrivals, preemption, and execution,
+        advancing time from one arrival, completion or quantum expiry to
+        the next, so the cost scales with dispatches rather than run_for.
+        Events are passed to emit in the order they appear in the log.
+        A Checkpoint, if given, is saved periodically and resumed from.
         """
+        order = self.order
+        arrival = self.table.arrival
+        remaining = self.table.remaining
+        start = self.table.start
+        finish = self.table.finish
+        response = self.table.response
+
         ready_queue = deque()
         finished_processes = []
         current_process = None
         quantum_counter = 0
-        
+
         process_idx = 0
-        raw_logs = []
-        
-        for time in range(self.run_for):
+
+        # Time only has to stop at ticks where something can change: an
+        # arrival, the running process finishing or using up its quantum.
+        # Everything in between is applied in one step.
+        time = 0
+        if checkpoint is not None and checkpoint.state is not None:
+            time, process_idx, ready_queue, finished_processes, current_process, quantum_counter = checkpoint.state
+            ready_queue = deque(ready_queue)
+
+        while time < self.run_for:
+            if checkpoint is not None and checkpoint.due(time):
+                checkpoint.save(time, (
+                    time, process_idx, list(ready_queue), finished_processes, current_process, quantum_counter
+                ))
+
+            # Check for new arrivals at the current time tick
+            while process_idx < len(order) and arrival[order[process_idx]] == time:
+                p = order[process_idx]
+                emit(time, ARRIVED, p)
+                ready_queue.append(p)
+                process_idx += 1
+
             # Check for a process finishing at the beginning of this time tick
-            if current_process and current_process.remaining_time == 0:
-                current_process.finish_time = time
-                current_process.turnaround_time = current_process.finish_time - current_process.arrival_time
-                current_process.wait_time = current_process.turnaround_time - current_process.burst_time
-                raw_logs.append((2, time, f"Time {time:3d} : {current_process.name} finished"))
+            if current_process is not None and remaining[current_process] == 0:
+                finish[current_process] = time
+                emit(time, FINISHED, current_process)
                 finished_processes.append(current_process)
                 current_process = None
                 quantum_counter = 0
 
-            # Check for new arrivals at the current time tick
-            while process_idx < len(self.processes) and self.processes[process_idx].arrival_time == time:
-                p = self.processes[process_idx]
-                raw_logs.append((1, time, f"Time {time:3d} : {p.name} arrived"))
-                ready_queue.append(p)
-                process_idx += 1
-            
-            # Preemption logic for the current process
-            if current_process and quantum_counter == self.quantum:
+            # Preemption logic for the current process. Arrivals at this
+            # tick are already queued ahead of it.
+            if current_process is not None and quantum_counter == self.quantum:
+                emit(time, PREEMPTED, current_process)
                 ready_queue.append(current_process)
                 current_process = None
                 quantum_counter = 0
-            
+
             # Select a new process if the CPU is idle
             if current_process is None and ready_queue:
                 current_process = ready_queue.popleft()
-                if current_process.start_time == -1:
-                    current_process.start_time = time
-                    current_process.response_time = time - current_process.arrival_time
-                raw_logs.append((3, time, f"Time {time:3d} : {current_process.name} selected (burst {current_process.remaining_time:3d})"))
-            
+                if start[current_process] == UNSET:
+                    start[current_process] = time
+                    response[current_process] = time - arrival[current_process]
+                emit(time, SELECTED, current_process, remaining[current_process])
+
+            # Next tick with an arrival. A process with a negative arrival
+            # time is never matched and holds back every process after it.
+            next_time = self.run_for
+            if process_idx < len(order) and arrival[order[process_idx]] > time:
+                next_time = min(next_time, arrival[order[process_idx]])
+
             # Execute or log Idle
-            if current_process:
-                current_process.remaining_time -= 1
-                quantum_counter += 1
+            if current_process is not None:
+                if remaining[current_process] > 0:
+                    next_time = min(next_time, time + remaining[current_process])
+                if quantum_counter < self.quantum:
+                    next_time = min(next_time, time + self.quantum - quantum_counter)
+                remaining[current_process] -= next_time - time
+                quantum_counter += next_time - time
             else:
-                raw_logs.append((4, time, f"Time {time:3d} : Idle"))
+                emit(time, IDLE, -1, next_time)
+
+            time = next_time
 
         # Handle any remaining processes after the main simulation loop
         # This is for the case where a process finishes exactly at run_for.
-        if current_process and current_process.remaining_time == 0:
-            current_process.finish_time = self.run_for
-            current_process.turnaround_time = current_process.finish_time - current_process.arrival_time
-            current_process.wait_time = current_process.turnaround_time - current_process.burst_time
-            raw_logs.append((2, self.run_for, f"Time {self.run_for:3d} : {current_process.name} finished"))
+        if current_process is not None and remaining[current_process] == 0:
+            finish[current_process] = self.run_for
+            emit(self.run_for, FINISHED, current_process)
             finished_processes.append(current_process)
-        
+
         # Unfinished processes: any process not in the finished list
-        remaining_processes = [p for p in self.processes if p.remaining_time > 0]
-        
-        return finished_processes, remaining_processes, raw_logs
+        remaining_processes = [p for p in order if remaining[p] > 0]
+
+        return finished_processes, remaining_processes
 
     def run(self):
         """
-        Executes the entire simulation workflow.
+        Executes the entire simulation workflow, streaming the event log to
+        the output file while the simulation runs.
         """
         self._validate()
-        
-        finished, remaining, raw_logs = [], [], []
-        if self.algorithm == 'rr':
-            finished, remaining, raw_logs = self._run_round_robin()
-        else:
+
+        if self.algorithm != 'rr':
             # Placeholder for other algorithms.
             # You would add other methods like self._run_fcfs() here.
             print(f"Error: Algorithm '{self.algorithm}' not implemented.")
             sys.exit(1)
 
-        # Sort logs by time, then by event priority (1=arrived, 2=finished, 3=selected, 4=idle)
-        raw_logs.sort(key=lambda x: (x[1], x[0]))
-        self.log = [message for _, _, message in raw_logs]
-            
-        self._generate_output(finished, remaining)
+        output_filename = output_path(self.filename)
+        checkpoint = self.checkpoint
+        position = checkpoint.start(self.table, output_filename) if checkpoint is not None else None
+        with open_output(output_filename, position) as f, \
+                open_trace(self.trace, self.table.names, self.run_for) as tracer, \
+                open_records(self.records, output_filename, self.table.names) as recorder:
+            with self.profile.phase("simulate"):
+                if checkpoint is not None:
+                    checkpoint.attach(f)
+                if position is None:
+                    self._write_header(f)
+                log = EventLog(f, self.algorithm, self.table.names, self.idle_spans)
+                run_stats = RunStats(self.run_for) if self.stats else None
+                emit = chain_sinks(self.profile.wrap(log), run_stats, tracer, recorder)
+                finished, remaining = self._run_round_robin(emit, checkpoint)
+            with self.profile.phase("summary"):
+                self._write_summary(f, finished, remaining)
+                if run_stats is not None:
+                    run_stats.add_table(self.table)
+                    write_stats(f, run_stats, self.per_job)
+                if recorder is not None:
+                    recorder.write_jobs(self.table)
+            with self.profile.phase("flush"):
+                f.flush()
+        if checkpoint is not None:
+            checkpoint.finish()
+
+    def _write_header(self, f):
+        """
+        Writes the process count and algorithm lines that precede the log.
+        """
+        f.write(f"  {self.process_count} processes\n")
+
+        if self.algorithm == 'rr':
+            f.write("Using Round-Robin\n")
+            f.write(f"Quantum   {self.quantum}\n\n")
+        else:
+            # Placeholder for other algorithms.
+            f.write(f"Using {self.algorithm.upper()}\n")
 
-    def _generate_output(self, finished_processes, remaining_processes):
+    def _write_summary(self, f, finished_processes, remaining_processes):
         """
-        Generates and writes the final output to a file with the specified format.
+        Writes the end-of-simulation line and the per-process metrics.
         """
-        output_filename = self.filename.split('.')[0] + ".out"
-        with open(output_filename, 'w') as f:
-            f.write(f"  {self.process_count} processes\n")
-            
-            if self.algorithm == 'rr':
-                f.write("Using Round-Robin\n")
-                f.write(f"Quantum   {self.quantum}\n\n")
-            else:
-                # Placeholder for other algorithms.
-                f.write(f"Using {self.algorithm.upper()}\n")
-            
-            for entry in self.log:
-                f.write(entry + "\n")
-            
-            f.write(f"Finished at time   {self.run_for}\n\n")
-
-            # Final summary of process metrics, sorted by process name
-            finished_processes.sort(key=lambda p: p.name)
-            for p in finished_processes:
-                f.write(f"{p.name} wait {p.wait_time:3d} turnaround {p.turnaround_time:3d} response {p.response_time:3d}\n")
-            
-            remaining_processes.sort(key=lambda p: p.name)
-            for p in remaining_processes:
-                f.write(f"{p.name} did not finish\n")
-
-def simulate_round_robin_scheduler(filename):
+        table = self.table
+        f.write(f"Finished at time   {self.run_for}\n\n")
+        if not self.per_job:
+            return
+
+        # Final summary of process metrics, sorted by process name
+        finished_processes.sort(key=table.names.__getitem__)
+        for p in finished_processes:
+            turnaround = table.finish[p] - table.arrival[p]
+            wait = turnaround - table.burst[p]
+            f.write(f"{table.names[p]} wait {wait:3d} turnaround {turnaround:3d} response {table.response[p]:3d}\n")
+
+        remaining_processes.sort(key=table.names.__getitem__)
+        for p in remaining_processes:
+            f.write(f"{table.names[p]} did not finish\n")
+
+def simulate_round_robin_scheduler(filename, workload=None, idle_spans=False, profile=NULL_PROFILER, checkpoint=None,
+                                   stats=False, per_job=True, trace=None, records=None):
     """
     Main function to run the scheduling simulation.
     This function will be used to test the scheduler.
     """
-    scheduler = RoundRobinScheduler(filename)
+    scheduler = RoundRobinScheduler(filename, workload, idle_spans, profile, checkpoint, stats, per_job, trace, records)
     scheduler.run()
 
-# Made with ChatGPT. Link: https://chatgpt.com/share/68d0388a-b734-8008-963f-05ad45dbc656
+# Aggregate metrics: distributions instead of per-job lines
 
-class SJFProcess:
-    def __init__(self, name, arrival, burst):
-        self.name = name
-        self.arrival = arrival
-        self.burst = burst
-        self.remaining = burst
-        self.start_time = None
-        self.finish_time = None
-        self.response_time = None
-
-    def __repr__(self):
-        return f"{self.name}(arrival={self.arrival}, burst={self.burst})"
+STATS_QUANTILES = (50, 90, 99)
 
 
-def parse_input(input_lines):
-    processes = []
-    runfor = None
-    algo = None
-    processcount = None
-
-    for line in input_lines:
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
+class QuantileSketch:
+    """
+    Streaming quantiles of integers in bounded memory. Values are counted
+    in buckets that keep their top PRECISION bits, so values below
+    2**PRECISION are exact and larger ones, reported as the middle of
+    their bucket, are off by at most 2**-PRECISION of their size. Memory
+    grows with the number of distinct buckets (at most 2**PRECISION per
+    power of two), never with the number of values.
+    """
+    PRECISION = 7
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        magnitude = abs(value)
+        shift = magnitude.bit_length() - self.PRECISION
+        if shift > 0:
+            magnitude = magnitude >> shift << shift
+            value = magnitude if value > 0 else -magnitude
+        self.buckets[value] = self.buckets.get(value, 0) + 1
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, p):
+        """Nearest-rank p-th percentile (0 if empty)."""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for value in sorted(self.buckets):
+            seen += self.buckets[value]
+            if seen >= rank:
+                # The middle of the bucket, for buckets wider than one value
+                shift = abs(value).bit_length() - self.PRECISION
+                if shift > 0:
+                    value += 1 << (shift - 1) if value > 0 else -(1 << (shift - 1))
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+class RunStats:
+    """
+    System-level summary of a run: wait, turnaround and response
+    distributions of the finished jobs, throughput, CPU utilization,
+    context switches and unfinished jobs. Also an event sink, counting
+    context switches and idle time as the engine reports them. Only a
+    dispatch of a different job than the CPU ran last is a switch; Round
+    Robin selecting the same job again is not.
+    """
+    METRICS = ("wait", "turnaround", "response")
+
+    def __init__(self, runfor, cpus=1):
+        self.runfor = runfor
+        self.cpus = cpus
+        self.jobs = 0
+        self.finished = 0
+        self.context_switches = 0
+        self.last_job = {}  # cpu -> job it selected last
+        self.idle_ticks = 0
+        self.sketches = {metric: QuantileSketch() for metric in self.METRICS}
+
+    def emit(self, time, event, job=-1, value=0, cpu=-1):
+        if event == SELECTED:
+            if self.last_job.get(cpu) != job:
+                self.last_job[cpu] = job
+                self.context_switches += 1
+        elif event == IDLE:
+            self.idle_ticks += value - time
+
+    def add_table(self, table):
+        """Adds every job of a finished run."""
+        wait, turnaround, response = (self.sketches[metric].add for metric in self.METRICS)
+        arrival, burst, finish = table.arrival, table.burst, table.finish
+        for i in range(len(table)):
+            if finish[i] != UNSET:
+                turnaround(finish[i] - arrival[i])
+                wait(finish[i] - arrival[i] - burst[i])
+                response(table.response[i])
+                self.finished += 1
+        self.jobs += len(table)
+
+    @property
+    def unfinished(self):
+        return self.jobs - self.finished
+
+    @property
+    def throughput(self):
+        """Finished jobs per tick."""
+        return self.finished / self.runfor if self.runfor > 0 else 0.0
+
+    @property
+    def utilization(self):
+        capacity = self.runfor * self.cpus
+        return 1 - self.idle_ticks / capacity if capacity > 0 else 0.0
+
+    def row(self):
+        """The summary as a flat dict, e.g. for a table of many runs."""
+        row = {
+            "jobs": self.jobs,
+            "finished": self.finished,
+            "unfinished": self.unfinished,
+            "throughput": self.throughput,
+            "utilization": self.utilization,
+            "context_switches": self.context_switches,
+        }
+        for metric, sketch in self.sketches.items():
+            row[f"{metric}_mean"] = sketch.mean()
+            for p in STATS_QUANTILES:
+                row[f"{metric}_p{p}"] = sketch.quantile(p)
+            row[f"{metric}_max"] = sketch.max if sketch.count else 0
+        return row
+
+    def write(self, f):
+        """Writes the summary block that --stats adds to a .out file."""
+        row = self.row()
+        f.write(f"Summary over {self.jobs} jobs: {self.finished} finished, {self.unfinished} unfinished\n")
+        f.write(
+            f"Throughput {self.throughput:.4f} jobs/tick, CPU utilization {100 * self.utilization:5.1f}%, "
+            f"{self.context_switches} context switches\n"
+        )
+        f.write(f"{'':10} {'mean':>10}" + "".join(f" {'p' + str(p):>8}" for p in STATS_QUANTILES) + f" {'max':>8}\n")
+        for metric in self.METRICS:
+            line = f"{metric:10} {row[metric + '_mean']:>10.2f}"
+            for p in STATS_QUANTILES:
+                line += f" {row[f'{metric}_p{p}']:>8}"
+            f.write(line + f" {row[metric + '_max']:>8}\n")
+
+
+def write_stats(f, run_stats, per_job):
+    """Appends the --stats block, set off from per-job lines if there are any."""
+    if per_job:
+        f.write("\n")
+    run_stats.write(f)
+
+# Round Robin quantum sweep
+
+def round_robin_metrics(workload, quantum):
+    """
+    Simulates workload under Round Robin with the given quantum, without
+    writing a log, and returns a dict of summary metrics for the run.
+    """
+    scheduler = RoundRobinScheduler(None, workload)
+    scheduler.quantum = quantum
+    stats = RunStats(workload.runfor)
+    scheduler._run_round_robin(stats.emit)
+    stats.add_table(scheduler.table)
+    return {"quantum": quantum, **stats.row()}
 
-        tokens = line.split()
-        if tokens[0] == "processcount":
-            if len(tokens) < 2:
-                print("Error: Missing parameter processcount")
-                sys.exit(1)
-            processcount = int(tokens[1])
 
-        elif tokens[0] == "runfor":
-            if len(tokens) < 2:
-                print("Error: Missing parameter runfor")
-                sys.exit(1)
-            runfor = int(tokens[1])
+_sweep_shared = None
 
-        elif tokens[0] == "use":
-            if len(tokens) < 2:
-                print("Error: Missing parameter use")
-                sys.exit(1)
-            algo = tokens[1].lower()
-            if algo not in {"sjf"}:
-                print(f"Error: Unsupported algorithm '{algo}'. Only 'sjf' is implemented.")
-                sys.exit(1)
 
-        elif tokens[0] == "process":
-            if "name" not in tokens:
-                print("Error: Missing parameter name")
-                sys.exit(1)
-            if "arrival" not in tokens:
-                print("Error: Missing parameter arrival")
-                sys.exit(1)
-            if "burst" not in tokens:
-                print("Error: Missing parameter burst")
-                sys.exit(1)
+def _init_sweep_worker(handle):
+    # Each worker attaches to the published workload once, not once per quantum
+    global _sweep_shared
+    _sweep_shared = SharedWorkload.attach(handle)
 
-            # name
-            name_index = tokens.index("name") + 1
-            if name_index >= len(tokens) or tokens[name_index] in {"arrival", "burst", "name"}:
-                print("Error: Missing parameter name")
-                sys.exit(1)
-            name = tokens[name_index]
 
-            # arrival
-            arrival_index = tokens.index("arrival") + 1
-            if arrival_index >= len(tokens) or tokens[arrival_index] in {"arrival", "burst", "name"}:
-                print("Error: Missing parameter arrival")
-                sys.exit(1)
-            try:
-                arrival = int(tokens[arrival_index])
-            except ValueError:
-                print("Error: Invalid arrival value")
-                sys.exit(1)
+def _sweep_one(quantum):
+    return round_robin_metrics(_sweep_shared.workload, quantum)
 
-            # burst
-            burst_index = tokens.index("burst") + 1
-            if burst_index >= len(tokens) or tokens[burst_index] in {"arrival", "burst", "name"}:
-                print("Error: Missing parameter burst")
-                sys.exit(1)
-            try:
-                burst = int(tokens[burst_index])
-            except ValueError:
-                print("Error: Invalid burst value")
-                sys.exit(1)
 
-            processes.append(SJFProcess(name, arrival, burst))
+def sweep_quantum(workload, quanta, jobs=None):
+    """
+    Simulates the workload under Round Robin once per quantum, spread over
+    a process pool. Returns one round_robin_metrics row per quantum, in the
+    order given.
+    """
+    quanta = list(quanta)
+    jobs = min(jobs or os.cpu_count() or 1, max(1, len(quanta)))
+    if jobs == 1:
+        return [round_robin_metrics(workload, q) for q in quanta]
 
-        elif tokens[0] == "end":
-            break
+    # The workload is published once in shared memory rather than pickled
+    # to every worker; only the metric rows come back
+    with SharedWorkload.publish(workload) as shared:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_sweep_worker, initargs=(shared.handle,)
+        ) as executor:
+            return list(executor.map(_sweep_one, quanta))
 
-    if processcount is None:
-        print("Error: Missing parameter processcount")
-        sys.exit(1)
-    if runfor is None:
-        print("Error: Missing parameter runfor")
-        sys.exit(1)
-    if algo is None:
-        print("Error: Missing parameter use")
-        sys.exit(1)
 
-    if processcount != len(processes):
-        print("Error: processcount does not match number of processes defined")
-        sys.exit(1)
+def parse_quanta(spec):
+    """
+    Parses a list of quanta: "1,2,5,10" or an inclusive range
+    "START:STOP" / "START:STOP:STEP".
+    """
+    try:
+        if ":" in spec:
+            bounds = [int(part) for part in spec.split(":")]
+            if len(bounds) not in (2, 3):
+                raise ValueError
+            step = bounds[2] if len(bounds) == 3 else 1
+            quanta = list(range(bounds[0], bounds[1] + 1, step))
+        else:
+            quanta = [int(part) for part in spec.split(",")]
+    except ValueError:
+        raise ValueError(f"invalid quantum list '{spec}'")
+    if not quanta or min(quanta) < 1:
+        raise ValueError(f"invalid quantum list '{spec}'")
+    return quanta
+
+
+def print_sweep_table(rows, out=sys.stdout):
+    print(
+        f"{'quantum':>7} {'switches':>9} {'unfin':>6} {'util':>6}"
+        f" {'wait':>9} {'p90':>7} {'p99':>7}"
+        f" {'turn':>9} {'p90':>7} {'p99':>7}"
+        f" {'resp':>9} {'p90':>7} {'p99':>7}",
+        file=out,
+    )
+    for row in rows:
+        line = (
+            f"{row['quantum']:>7} {row['context_switches']:>9} {row['unfinished']:>6}"
+            f" {100 * row['utilization']:>5.1f}%"
+        )
+        for metric in RunStats.METRICS:
+            line += f" {row[metric + '_mean']:>9.2f} {row[metric + '_p90']:>7} {row[metric + '_p99']:>7}"
+        print(line, file=out)
 
-    return processes, runfor, algo
+# Made with ChatGPT. Link: https://chatgpt.com/share/68d0388a-b734-8008-963f-05ad45dbc656
 
+def sjf_preemptive_scheduler(table, runtime, emit, checkpoint=None):
+    arrival = table.arrival
+    remaining = table.remaining
+    start = table.start
+    finish = table.finish
+    response = table.response
+
+    # Jobs are visited in arrival order (input order breaks ties, as the
+    # arrival scan did), and the simulation jumps from one arrival or
+    # completion to the next instead of stepping every tick.
+    arrivals = [i for i in table.arrival_order() if 0 <= arrival[i] < runtime]
+    next_arrival = 0
+
+    # Waiting jobs keyed by (remaining, arrival, input index): the same
+    # order min() over the ready queue picked. The running job is kept
+    # outside the heap and pushed back when it is preempted.
+    ready_heap = []
+    current = None
 
-def sjf_preemptive_scheduler(processes, runtime, output_file):
     time = 0
-    ready_queue = []
-    current_process = None
-
-    log = []
-    finished = []
+    if checkpoint is not None and checkpoint.state is not None:
+        time, next_arrival, ready_heap, current = checkpoint.state
 
     while time < runtime:
+        if checkpoint is not None and checkpoint.due(time):
+            checkpoint.save(time, (time, next_arrival, ready_heap, current))
+
         # (1) Arrivals
-        for p in processes:
-            if p.arrival == time:
-                log.append(f"Time {time:3} : {p.name} arrived")
-                ready_queue.append(p)
+        while next_arrival < len(arrivals) and arrival[arrivals[next_arrival]] == time:
+            i = arrivals[next_arrival]
+            emit(time, ARRIVED, i)
+            heapq.heappush(ready_heap, (remaining[i], arrival[i], i))
+            next_arrival += 1
 
         # (2) Finishes
-        finishes_this_tick = [p for p in processes if p.finish_time == time]
-        for p in finishes_this_tick:
-            log.append(f"Time {time:3} : {p.name} finished")
-            if p in ready_queue:
-                ready_queue.remove(p)
-            if current_process == p:
-                current_process = None
-            if p not in finished:
-                finished.append(p)
+        if current is not None and finish[current] == time:
+            emit(time, FINISHED, current)
+            current = None
 
         # (3) Choose process
-        if ready_queue:
-            candidate = min(ready_queue, key=lambda x: (x.remaining, x.arrival))
-            if candidate != current_process:
-                current_process = candidate
-                if current_process.start_time is None:
-                    current_process.start_time = time
-                    current_process.response_time = time - current_process.arrival
-                log.append(f"Time {time:3} : {current_process.name} selected (burst {current_process.remaining:3})")
+        if ready_heap and (current is None or ready_heap[0] < (remaining[current], arrival[current], current)):
+            if current is not None:
+                emit(time, PREEMPTED, current)
+                heapq.heappush(ready_heap, (remaining[current], arrival[current], current))
+            current = heapq.heappop(ready_heap)[2]
+            if start[current] == UNSET:
+                start[current] = time
+                response[current] = time - arrival[current]
+            emit(time, SELECTED, current, remaining[current])
+
+        if next_arrival < len(arrivals):
+            next_event = arrival[arrivals[next_arrival]]
         else:
-            if current_process is None:
-                log.append(f"Time {time:3} : Idle")
+            next_event = runtime
 
-        # (4) Run one tick
-        if current_process:
-            current_process.remaining -= 1
-            if current_process.remaining == 0:
-                current_process.finish_time = time + 1
+        if current is None:
+            emit(time, IDLE, -1, next_event)
+            time = next_event
+            continue
 
-        time += 1
+        # (4) Run until the next arrival or the current job's completion
+        if remaining[current] > 0:
+            next_event = min(next_event, time + remaining[current])
+        remaining[current] -= next_event - time
+        if remaining[current] == 0:
+            finish[current] = next_event
+        time = next_event
 
-    log.append(f"Finished at time {runtime:3}")
-    log.append("")
 
-    for p in processes:
-        if p.finish_time is None:
-            log.append(f"{p.name} did not finish")
-        else:
-            turnaround = p.finish_time - p.arrival
-            waiting = turnaround - p.burst
-            response = p.response_time if p.response_time is not None else 0
-            log.append(f"{p.name} wait {waiting:3} turnaround {turnaround:3} response {response:3}")
+def write_sjf_summary(f, table, runtime, per_job=True):
+    f.write(f"Finished at time {runtime:3}\n\n")
+    if not per_job:
+        return
 
-    with open(output_file, "w") as f:
-        f.write(f"{len(processes)} processes\n")
-        f.write("Using preemptive Shortest Job First\n")
-        for line in log:
-            f.write(line + "\n")
+    for i in range(len(table)):
+        if table.finish[i] == UNSET:
+            f.write(f"{table.names[i]} did not finish\n")
+        else:
+            turnaround = table.finish[i] - table.arrival[i]
+            waiting = turnaround - table.burst[i]
+            response = table.response[i] if table.response[i] != UNSET else 0
+            f.write(f"{table.names[i]} wait {waiting:3} turnaround {turnaround:3} response {response:3}\n")
+
+
+def run_sjf_scheduler(workload, output_file, idle_spans=False, profile=NULL_PROFILER, checkpoint=None,
+                      stats=False, per_job=True, trace=None, records=None):
+    table = workload.table()
+    run_stats = RunStats(workload.runfor) if stats else None
+    position = checkpoint.start(table, output_file) if checkpoint is not None else None
+
+    # The log is streamed to the file while the simulation runs
+    with open_output(output_file, position) as f, open_trace(trace, table.names, workload.runfor) as tracer, \
+            open_records(records, output_file, table.names) as recorder:
+        with profile.phase("simulate"):
+            if checkpoint is not None:
+                checkpoint.attach(f)
+            if position is None:
+                f.write(f"{len(table)} processes\n")
+                f.write("Using preemptive Shortest Job First\n")
+            log = EventLog(f, "sjf", table.names, idle_spans)
+            emit = chain_sinks(profile.wrap(log), run_stats, tracer, recorder)
+            sjf_preemptive_scheduler(table, workload.runfor, emit, checkpoint)
+        with profile.phase("summary"):
+            write_sjf_summary(f, table, workload.runfor, per_job)
+            if run_stats is not None:
+                run_stats.add_table(table)
+                write_stats(f, run_stats, per_job)
+            if recorder is not None:
+                recorder.write_jobs(table)
+        with profile.phase("flush"):
+            f.flush()
+    if checkpoint is not None:
+        checkpoint.finish()
 
 
 def run_sjf_scheduler_from_file(input_file):
-    if not input_file.endswith(".in"):
+    if workload_extension(input_file) != ".in":
         print("Error: Input file must have .in extension")
         sys.exit(1)
 
-    output_file = os.path.splitext(input_file)[0] + ".out"
+    output_file = output_path(input_file)
 
-    with open(input_file, "r") as f:
-        input_data = f.readlines()
+    try:
+        workload = load_workload(input_file)
+    except WorkloadError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-    processes, runfor, algo = parse_input(input_data)
+    if workload.algorithm != "sjf":
+        print(f"Error: Unsupported algorithm '{workload.algorithm}'. Only 'sjf' is implemented.")
+        sys.exit(1)
 
-    if algo == "sjf":
-        sjf_preemptive_scheduler(processes, runfor, output_file)
+    run_sjf_scheduler(workload, output_file)
 
 # ChatGPT used for implementation: https://chatgpt.com/share/68d8b0f2-e110-8000-b7dd-7b76757223c5
 
-class FIFOProcess:
-    def __init__(self, name, arrival, burst):
-        self.name = name
-        self.arrival = arrival
-        self.burst = burst
-        self.remaining = burst
-        self.start_time = None
-        self.finish_time = None
-
-def parse_file(filename):
-    # --- Error checking ---
-    if not os.path.exists(filename):
-        print(f"Error: file '{filename}' not found.", file=sys.stderr)
-        sys.exit(1)
-    if not os.path.isfile(filename):
-        print(f"Error: '{filename}' is not a valid file.", file=sys.stderr)
-        sys.exit(1)
+def fifo_scheduler(table, runfor, emit, checkpoint=None):
+    """
+    First-Come First-Served without the per-tick loop.
 
-    process_count = 0
-    runfor = 0
-    algorithm = ""
-    processes = []
+    Under FCFS a job starts at max(its arrival, finish of the job before it)
+    and runs to completion, so start and finish times follow directly from
+    the arrival-sorted list in a single pass. Arrival events are merged in
+    the same order the tick loop produces them.
 
-    with open(filename, "r") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
+    Returns the process ids in arrival order and the names of the processes
+    that did not finish. A Checkpoint, if given, is saved between jobs.
+    """
+    names = table.names
+    arrival = table.arrival
+    burst = table.burst
+    remaining = table.remaining
+    order = table.arrival_order()
 
-            parts = line.split()
-
-            if parts[0] == "processcount":
-                process_count = int(parts[1])
-            elif parts[0] == "runfor":
-                runfor = int(parts[1])
-            elif parts[0] == "use":
-                algorithm = parts[1].lower()
-            elif parts[0] == "process":
-                # Example: process name A arrival 0 burst 5
-                name = parts[2]
-                arrival = int(parts[4])
-                burst = int(parts[6])
-                processes.append(FIFOProcess(name, arrival, burst))
-            elif parts[0] == "end":
-                break
+    finished_processes = set()
+
+    # Only arrivals inside [0, runfor) are ever seen by the simulator
+    arrivals = [i for i in order if 0 <= arrival[i] < runfor]
+    next_arrival = 0
+    free = 0  # time at which the CPU is next free
+
+    def log_arrivals_until(time):
+        nonlocal next_arrival
+        while next_arrival < len(arrivals) and arrival[arrivals[next_arrival]] <= time:
+            i = arrivals[next_arrival]
+            emit(arrival[i], ARRIVED, i)
+            next_arrival += 1
+
+    first = 0
+    if checkpoint is not None and checkpoint.state is not None:
+        first, next_arrival, free, finished_processes = checkpoint.state
+
+    for k in range(first, len(arrivals)):
+        if checkpoint is not None and checkpoint.due(free):
+            checkpoint.save(free, (k, next_arrival, free, finished_processes))
+
+        i = arrivals[k]
+        start = max(free, arrival[i])
+        if start >= runfor:
+            break
+
+        # The queue is empty until this job arrives
+        if start > free:
+            emit(free, IDLE, -1, start)
+
+        log_arrivals_until(start)
+        table.start[i] = start
+        table.response[i] = start - arrival[i]
+        emit(start, SELECTED, i, remaining[i])
+
+        finish = start + burst[i]
+        if burst[i] <= 0 or finish > runfor:
+            # Still on the CPU when the simulation ends (a job with a
+            # non-positive burst never reaches zero and holds the CPU)
+            remaining[i] = burst[i] - (runfor - start)
+            free = runfor
+            break
+
+        log_arrivals_until(finish - 1)
+        remaining[i] = 0
+        table.finish[i] = finish
+        emit(finish, FINISHED, i)
+        finished_processes.add(names[i])
+        free = finish
+
+    if free < runfor:
+        emit(free, IDLE, -1, runfor)
 
-    return process_count, runfor, algorithm, processes
+    log_arrivals_until(runfor - 1)
 
+    unfinished = [names[i] for i in order if names[i] not in finished_processes]
+    return order, unfinished
 
-def fifo_scheduler(processes, runfor):
-    processes.sort(key=lambda p: p.arrival)
+
+def fifo_scheduler_tick(table, runfor, emit):
+    """
+    Reference FCFS engine that steps the simulation one tick at a time.
+    Kept to cross-check fifo_scheduler; both emit the same events.
+    """
+    names = table.names
+    arrival = table.arrival
+    remaining = table.remaining
+    order = table.arrival_order()
 
     time = 0
-    log_lines = []
     finished_processes = set()
     ready_queue = []
+    idle_since = None  # start of the current idle span, if any
 
     while time < runfor:
         # Check for arrivals
-        for p in processes:
-            if p.arrival == time:
-                log_lines.append(f"time {time} : {p.name} arrived")
-                ready_queue.append(p)
+        for i in order:
+            if arrival[i] == time:
+                if idle_since is not None:
+                    emit(idle_since, IDLE, -1, time)
+                    idle_since = None
+                emit(time, ARRIVED, i)
+                ready_queue.append(i)
 
         if ready_queue:
             current = ready_queue[0]
-            if current.start_time is None:
-                current.start_time = time
-                log_lines.append(f"time {time} : {current.name} selected (burst {current.remaining})")
+            if table.start[current] == UNSET:
+                table.start[current] = time
+                table.response[current] = time - arrival[current]
+                emit(time, SELECTED, current, remaining[current])
 
-            current.remaining -= 1
+            remaining[current] -= 1
 
-            if current.remaining == 0:
-                current.finish_time = time + 1
-                log_lines.append(f"time {time+1} : {current.name} finished")
-                finished_processes.add(current.name)
+            if remaining[current] == 0:
+                table.finish[current] = time + 1
+                emit(time + 1, FINISHED, current)
+                finished_processes.add(names[current])
                 ready_queue.pop(0)
-        else:
-            log_lines.append(f"time {time} : Idle")
+        elif idle_since is None:
+            idle_since = time
 
         time += 1
 
-    log_lines.append(f"time {runfor} : Simulator ended")
+    if idle_since is not None:
+        emit(idle_since, IDLE, -1, runfor)
 
-    unfinished = [p.name for p in processes if p.name not in finished_processes]
-    return log_lines, processes, unfinished
+    unfinished = [names[i] for i in order if names[i] not in finished_processes]
+    return order, unfinished
 
 
-def calculate_metrics(processes):
+def calculate_metrics(table, order):
     metrics = {}
-    for p in processes:
-        if p.finish_time is None:
+    for i in order:
+        if table.finish[i] == UNSET:
             continue
-        turnaround = p.finish_time - p.arrival
-        waiting = turnaround - p.burst
-        response = p.start_time - p.arrival
-        metrics[p.name] = {
+        turnaround = table.finish[i] - table.arrival[i]
+        waiting = turnaround - table.burst[i]
+        response = table.start[i] - table.arrival[i]
+        metrics[table.names[i]] = {
             "Turnaround": turnaround,
             "Waiting": waiting,
             "Response": response,
@@ -522,86 +1866,2007 @@ def calculate_metrics(processes):
     return metrics
 
 
-def run_fifo_scheduler_from_file(input_filename):
-    # --- Parse input file ---
-    process_count, runfor, algorithm, processes = parse_file(input_filename)
+def run_fifo_scheduler(workload, output_filename, reference=False, idle_spans=False, profile=NULL_PROFILER,
+                       checkpoint=None, stats=False, per_job=True, trace=None, records=None):
+    table = workload.table()
+    run_stats = RunStats(workload.runfor) if stats else None
+    position = checkpoint.start(table, output_filename) if checkpoint is not None else None
 
-    if algorithm != "fcfs":
-        print(f"Warning: input requested '{algorithm}', running FIFO instead.", file=sys.stderr)
+    # --- Simulate, streaming the log to the output file ---
+    try:
+        with open_output(output_filename, position) as f, open_trace(trace, table.names, workload.runfor) as tracer, \
+                open_records(records, output_filename, table.names) as recorder:
+            with profile.phase("simulate"):
+                if checkpoint is not None:
+                    checkpoint.attach(f)
+                if position is None:
+                    f.write(f"{workload.process_count} processes\n")
+                    f.write("Using First-Come First-Served\n")
+
+                log = EventLog(f, "fcfs", table.names, idle_spans)
+                emit = chain_sinks(profile.wrap(log), run_stats, tracer, recorder)
+                if reference:
+                    # The original tick-by-tick loop, without checkpoints
+                    order, unfinished = fifo_scheduler_tick(table, workload.runfor, emit)
+                else:
+                    order, unfinished = fifo_scheduler(table, workload.runfor, emit, checkpoint)
+                f.write(f"time {workload.runfor} : Simulator ended\n")
+
+            with profile.phase("summary"):
+                f.write("\n")
+                if per_job:
+                    metrics = calculate_metrics(table, order)
+                    for i in order:
+                        if table.finish[i] != UNSET:
+                            name = table.names[i]
+                            f.write(
+                                f"{name} wait {metrics[name]['Waiting']} "
+                                f"turnaround {metrics[name]['Turnaround']} "
+                                f"response {metrics[name]['Response']}\n"
+                            )
+
+                    for name in unfinished:
+                        f.write(f"{name} did not finish\n")
+
+                if run_stats is not None:
+                    run_stats.add_table(table)
+                    write_stats(f, run_stats, per_job)
+                if recorder is not None:
+                    recorder.write_jobs(table)
+
+            with profile.phase("flush"):
+                f.flush()
+
+    except OSError as e:
+        print(f"Error: could not write to output file '{output_filename}': {e}", file=sys.stderr)
+        sys.exit(1)
+    if checkpoint is not None:
+        checkpoint.finish()
 
-    log_lines, processes, unfinished = fifo_scheduler(processes, runfor)
-    metrics = calculate_metrics(processes)
 
-    # --- Write output file ---
-    output_filename = os.path.splitext(input_filename)[0] + ".out"
+def run_fifo_scheduler_from_file(input_filename, reference=False):
+    # --- Parse input file ---
     try:
-        with open(output_filename, "w") as f:
-            f.write(f"{process_count} processes\n")
-            f.write("Using First-Come First-Served\n")
+        workload = load_workload(input_filename)
+    except WorkloadError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if workload.algorithm != "fcfs":
+        print(f"Warning: input requested '{workload.algorithm}', running FIFO instead.", file=sys.stderr)
+
+    output_filename = output_path(input_filename)
+    run_fifo_scheduler(workload, output_filename, reference)
+
+# Multi-CPU (SMP) simulation
+
+SMP_BALANCE = ("steal", "global")
+SMP_HELD_CHUNK = 4096  # held-back events unpacked at a time when they are written
+
+
+class FIFOQueue:
+    """First-come first-served run queue, used by FCFS and Round Robin."""
+    __slots__ = ("jobs",)
+
+    def __init__(self, table):
+        self.jobs = deque()
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def push(self, job):
+        self.jobs.append(job)
 
-            for line in log_lines:
-                f.write(line + "\n")
+    def pop(self):
+        return self.jobs.popleft()
 
+
+class SJFQueue:
+    """Run queue ordered by (remaining, arrival, input index)."""
+    __slots__ = ("jobs", "table")
+
+    def __init__(self, table):
+        self.jobs = []
+        self.table = table
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def push(self, job):
+        heapq.heappush(self.jobs, (self.table.remaining[job], self.table.arrival[job], job))
+
+    def pop(self):
+        return heapq.heappop(self.jobs)[2]
+
+    def first(self):
+        return self.jobs[0]
+
+
+def smp_scheduler(table, runfor, algorithm, quantum, cpus, balance, emit):
+    """
+    Simulates the workload on several CPUs.
+
+    With balance="steal" every CPU has its own run queue. An arrival goes
+    to an idle CPU if there is one and is otherwise dealt out round robin;
+    a CPU that runs out of work steals the next job of the longest queue.
+    With balance="global" all CPUs share one queue and the lowest numbered
+    idle CPU is served first.
+
+    Time jumps between arrivals and the ends of time slices, kept in a
+    heap of CPU timers, so the cost grows with the number of events and
+    not with cpus * runfor. An idle span is only known once it ends, so
+    the events after its start are held back until then and the log stays
+    in time order.
+
+    As on one CPU, a job finishes when its remaining time reaches exactly
+    0, so a job with a burst of 0 never does: under FCFS and SJF it holds
+    its CPU until the end of the run, under RR it takes whole quanta.
+
+    Returns the busy ticks and dispatch count per CPU, and the number of
+    jobs stolen.
+    """
+    arrival = table.arrival
+    remaining = table.remaining
+    start = table.start
+    finish = table.finish
+    response = table.response
+
+    stealing = balance == "steal"
+    preemptive = algorithm == "sjf"
+    slice_limit = quantum if algorithm == "rr" and quantum is not None and quantum > 0 else 0
+    queue_type = SJFQueue if preemptive else FIFOQueue
+    queues = [queue_type(table) for _ in range(cpus if stealing else 1)]
+
+    running = [-1] * cpus
+    slice_start = array("q", [0]) * cpus
+    generation = array("q", [0]) * cpus  # invalidates the timer of a preempted slice
+    idle_since = array("q", [0]) * cpus
+    busy = array("q", [0]) * cpus
+    dispatches = array("q", [0]) * cpus
+    steals = 0
+
+    idle = list(range(cpus))  # heap of idle CPUs with nothing queued for them
+    timers = []  # (end of slice, cpu, generation)
+    longest = []  # global SJF: (-expected finish, -arrival, -id, cpu, generation)
+    loads = []  # stealing: (-queue length, cpu); validated against advertised
+    advertised = array("q", [0]) * cpus
+    woken = []  # CPUs to dispatch at the current tick
+    touched = []  # busy CPUs whose queue got an arrival (SJF preemption)
+    placement = 0
+
+    # Events held back behind the oldest open idle span, as five int64
+    # fields each. Records are numbered from the start of the run; held
+    # starts at record held_base and is written up to written.
+    held = array("q")
+    held_base = 0
+    written = 0
+    open_span = [-1] * cpus  # record of each CPU's open idle span
+    stopped = list(range(cpus))  # CPUs that may have gone idle since the last tick
+
+    def note(time, event, job=-1, value=0, cpu=-1):
+        if held:
+            held.extend((time, event, job, value, cpu))
+        else:
+            emit(time, event, job, value, cpu)
+
+    def open_idle(cpu):
+        open_span[cpu] = held_base + len(held) // 5
+        held.extend((idle_since[cpu], IDLE, -1, UNSET, cpu))
+
+    def close_idle(cpu, time):
+        nonlocal held_base, written
+        record = open_span[cpu]
+        open_span[cpu] = -1
+        held[5 * (record - held_base) + 3] = time
+        if record != written:
+            return  # an older span is still open
+
+        still_open = [r for r in open_span if r != -1]
+        end = min(still_open) if still_open else held_base + len(held) // 5
+        while written < end:
+            stop = min(end, written + SMP_HELD_CHUNK)
+            chunk = iter(held[5 * (written - held_base):5 * (stop - held_base)].tolist())
+            for fields in zip(chunk, chunk, chunk, chunk, chunk):
+                emit(*fields)
+            written = stop
+        if 2 * (written - held_base) >= len(held) // 5:
+            del held[:5 * (written - held_base)]
+            held_base = written
+
+    def enqueue(cpu, job):
+        queue = queues[cpu]
+        queue.push(job)
+        if stealing and len(queue) > advertised[cpu]:
+            advertised[cpu] = len(queue)
+            heapq.heappush(loads, (-len(queue), cpu))
+
+    def end_slice(cpu, time):
+        job = running[cpu]
+        ran = time - slice_start[cpu]
+        remaining[job] -= ran
+        busy[cpu] += ran
+        running[cpu] = -1
+        idle_since[cpu] = time
+        stopped.append(cpu)
+        return job
+
+    def dispatch(cpu, job, time):
+        if open_span[cpu] != -1:
+            close_idle(cpu, time)
+        running[cpu] = job
+        slice_start[cpu] = time
+        generation[cpu] += 1
+        dispatches[cpu] += 1
+        if start[job] == UNSET:
+            start[job] = time
+            response[job] = time - arrival[job]
+        note(time, SELECTED, job, remaining[job], cpu)
+
+        length = remaining[job]
+        if slice_limit and not 0 < length <= slice_limit:
+            length = slice_limit
+        if length <= 0:
+            return  # never finishes
+        heapq.heappush(timers, (time + length, cpu, generation[cpu]))
+        if preemptive and not stealing:
+            heapq.heappush(longest, (-(time + length), -arrival[job], -job, cpu, generation[cpu]))
+
+    def steal():
+        nonlocal steals
+        while loads:
+            length, victim = loads[0]
+            length = -length
+            actual = len(queues[victim])
+            if length != advertised[victim]:
+                heapq.heappop(loads)  # superseded entry
+            elif actual == length:
+                steals += 1
+                return queues[victim].pop()
+            elif actual > 0:
+                advertised[victim] = actual
+                heapq.heapreplace(loads, (-actual, victim))
+            else:
+                advertised[victim] = 0
+                heapq.heappop(loads)
+        return -1
+
+    def release(cpu):
+        if stealing:
+            woken.append(cpu)
+        else:
+            heapq.heappush(idle, cpu)
+
+    def sjf_key(cpu, time):
+        job = running[cpu]
+        return (remaining[job] - (time - slice_start[cpu]), arrival[job], job)
+
+    arrivals = [i for i in table.arrival_order() if 0 <= arrival[i] < runfor]
+    next_arrival = 0
+
+    while True:
+        time = runfor
+        if next_arrival < len(arrivals):
+            time = arrival[arrivals[next_arrival]]
+        if timers and timers[0][0] < time:
+            time = timers[0][0]
+        if time >= runfor:
+            break
+
+        # Spans of CPUs left idle by an earlier tick start here in the log;
+        # at time 0 every CPU is still waiting for its first job
+        if time > 0:
+            for cpu in stopped:
+                if running[cpu] == -1 and open_span[cpu] == -1:
+                    open_idle(cpu)
+            stopped.clear()
+
+        # Arrivals
+        while next_arrival < len(arrivals) and arrival[arrivals[next_arrival]] == time:
+            job = arrivals[next_arrival]
+            next_arrival += 1
+            note(time, ARRIVED, job, 0, -1)
+            if not stealing:
+                queues[0].push(job)
+            elif idle:
+                cpu = heapq.heappop(idle)
+                enqueue(cpu, job)
+                woken.append(cpu)
+            else:
+                cpu = placement
+                placement = (placement + 1) % cpus
+                enqueue(cpu, job)
+                if preemptive and running[cpu] != -1:
+                    touched.append(cpu)
+
+        # Time slices ending now: the job finished or used up its quantum
+        while timers and timers[0][0] == time:
+            _, cpu, gen = heapq.heappop(timers)
+            if gen != generation[cpu] or running[cpu] == -1:
+                continue
+            job = end_slice(cpu, time)
+            if remaining[job] == 0:
+                finish[job] = time
+                note(time, FINISHED, job, 0, cpu)
+            else:
+                note(time, PREEMPTED, job, 0, cpu)
+                enqueue(cpu if stealing else 0, job)
+            release(cpu)
+
+        # Dispatch
+        if stealing:
+            for cpu in woken:
+                if running[cpu] != -1:
+                    continue
+                job = queues[cpu].pop() if queues[cpu] else steal()
+                if job == -1:
+                    heapq.heappush(idle, cpu)
+                else:
+                    dispatch(cpu, job, time)
+            woken.clear()
+
+            for cpu in touched:
+                queue = queues[cpu]
+                if running[cpu] != -1 and queue and queue.first() < sjf_key(cpu, time):
+                    job = end_slice(cpu, time)
+                    note(time, PREEMPTED, job, 0, cpu)
+                    queue.push(job)
+                    dispatch(cpu, queue.pop(), time)
+            touched.clear()
+        else:
+            queue = queues[0]
+            while queue and idle:
+                dispatch(heapq.heappop(idle), queue.pop(), time)
+
+            # A waiting job shorter than the longest running one takes its CPU
+            while preemptive and queue and longest:
+                _, _, _, cpu, gen = longest[0]
+                if gen != generation[cpu] or running[cpu] == -1:
+                    heapq.heappop(longest)
+                    continue
+                if not queue.first() < sjf_key(cpu, time):
+                    break
+                heapq.heappop(longest)
+                job = end_slice(cpu, time)
+                note(time, PREEMPTED, job, 0, cpu)
+                queue.push(job)
+                dispatch(cpu, queue.pop(), time)
+
+    for cpu in stopped:
+        if running[cpu] == -1 and open_span[cpu] == -1 and idle_since[cpu] < runfor:
+            open_idle(cpu)
+    for cpu in range(cpus):
+        if open_span[cpu] != -1:
+            close_idle(cpu, runfor)
+
+    # Slices ending exactly at runfor still count as finished
+    while timers and timers[0][0] == runfor:
+        _, cpu, gen = heapq.heappop(timers)
+        if gen == generation[cpu] and running[cpu] != -1:
+            job = end_slice(cpu, runfor)
+            if remaining[job] == 0:
+                finish[job] = runfor
+                emit(runfor, FINISHED, job, 0, cpu)
+
+    for cpu in range(cpus):
+        if running[cpu] != -1:
+            end_slice(cpu, runfor)
+
+    return busy, dispatches, steals
+
+
+def cpu_count(cpus):
+    return "1 CPU" if cpus == 1 else f"{cpus} CPUs"
+
+
+def write_smp_summary(f, table, runfor, busy, dispatches, steals, per_job=True):
+    f.write(f"Finished at time {runfor:3}\n\n")
+
+    if per_job:
+        for i in range(len(table)):
+            if table.finish[i] == UNSET:
+                f.write(f"{table.names[i]} did not finish\n")
+            else:
+                turnaround = table.finish[i] - table.arrival[i]
+                waiting = turnaround - table.burst[i]
+                f.write(f"{table.names[i]} wait {waiting:3} turnaround {turnaround:3} response {table.response[i]:3}\n")
+        f.write("\n")
+
+    for cpu in range(len(busy)):
+        utilization = 100 * busy[cpu] / runfor if runfor > 0 else 0.0
+        f.write(f"CPU {cpu} busy {busy[cpu]:3} utilization {utilization:5.1f}% dispatches {dispatches[cpu]:3}\n")
+    total = 100 * sum(busy) / (runfor * len(busy)) if runfor > 0 else 0.0
+    f.write(f"Average utilization {total:5.1f}% over {cpu_count(len(busy))}, {steals} jobs stolen\n")
+
+
+def run_smp_scheduler(workload, output_file, cpus, balance="steal", profile=NULL_PROFILER, stats=False, per_job=True,
+                      trace=None, records=None):
+    """
+    Runs the workload's algorithm on cpus CPUs and writes the tagged log,
+    per-job metrics and per-CPU utilization to output_file.
+    """
+    table = workload.table()
+    run_stats = RunStats(workload.runfor, cpus) if stats else None
+    names = {"fcfs": "First-Come First-Served", "sjf": "preemptive Shortest Job First", "rr": "Round-Robin"}
+
+    with open_output(output_file) as f, open_trace(trace, table.names, workload.runfor, cpus) as tracer, \
+            open_records(records, output_file, table.names) as recorder:
+        with profile.phase("simulate"):
+            f.write(f"{len(table)} processes\n")
+            f.write(f"Using {names[workload.algorithm]} on {cpu_count(cpus)} ({balance} balancing)\n")
+            if workload.algorithm == "rr":
+                f.write(f"Quantum {workload.quantum:3}\n")
             f.write("\n")
-            for p in processes:
-                if p.finish_time is not None:
-                    f.write(
-                        f"{p.name} wait {metrics[p.name]['Waiting']} "
-                        f"turnaround {metrics[p.name]['Turnaround']} "
-                        f"response {metrics[p.name]['Response']}\n"
-                    )
+            # Per-tick idle lines would cost cpus * runfor, so idle time is always
+            # written as spans
+            log = EventLog(f, "smp", table.names, idle_spans=True)
+            emit = chain_sinks(profile.wrap(log), run_stats, tracer, recorder)
+            busy, dispatches, steals = smp_scheduler(
+                table, workload.runfor, workload.algorithm, workload.quantum, cpus, balance, emit
+            )
+        with profile.phase("summary"):
+            write_smp_summary(f, table, workload.runfor, busy, dispatches, steals, per_job)
+            if run_stats is not None:
+                run_stats.add_table(table)
+                write_stats(f, run_stats, True)
+            if recorder is not None:
+                recorder.write_jobs(table)
+        with profile.phase("flush"):
+            f.flush()
+
+# Streaming API: jobs in, events out
+
+class StreamJob:
+    """An in-flight job of stream_schedule; dropped as soon as it finishes."""
+    __slots__ = ("name", "arrival", "remaining", "seq")
+
+    def __init__(self, name, arrival, remaining, seq):
+        self.name = name
+        self.arrival = arrival
+        self.remaining = remaining
+        self.seq = seq
+
+
+def stream_schedule(jobs, algorithm, quantum=None, runfor=None):
+    """
+    Schedules jobs as they come in and yields (time, event, name, value)
+    tuples as soon as they are decided.
+
+    jobs is any iterable of (name, arrival, burst) ordered by arrival; it is
+    read one job ahead of the simulation, so it can be a live feed. Events
+    use the codes and values of the engines: value is the remaining burst
+    for SELECTED and the end of the span for IDLE. Events at the same time
+    come in the order arrivals, finish, preemption, selection.
+
+    Without runfor the generator stops once the input is exhausted and the
+    last job has finished. Only jobs that have arrived and not finished are
+    held in memory.
+    """
+    if algorithm not in {"fcfs", "sjf", "rr"}:
+        raise ValueError(f"Unsupported algorithm '{algorithm}'")
+    if algorithm == "rr" and quantum is None:
+        raise ValueError("Missing quantum parameter when use is 'rr'")
+
+    jobs = iter(jobs)
+    horizon = math.inf if runfor is None else runfor
+    preemptive = algorithm == "sjf"
+    slice_limit = quantum if algorithm == "rr" and quantum > 0 else 0
+    seq = 0
+    last_arrival = None
+
+    def pull():
+        nonlocal seq, last_arrival
+        for name, arrival, burst in jobs:
+            if arrival < 0:
+                raise ValueError(f"job {name!r} has a negative arrival time {arrival}")
+            if last_arrival is not None and arrival < last_arrival:
+                raise ValueError(f"job {name!r} arrives at {arrival}, before the previous job at {last_arrival}")
+            if burst < 0:
+                raise ValueError(f"job {name!r} has a negative burst")
+            last_arrival = arrival
+            seq += 1
+            return StreamJob(name, arrival, burst, seq)
+        return None
+
+    ready = [] if preemptive else deque()
+    current = None
+    slice_used = 0
+    pending = pull()
+
+    time = 0
+    while time < horizon:
+        # Arrivals
+        while pending is not None and pending.arrival == time:
+            yield (time, ARRIVED, pending.name, 0)
+            if preemptive:
+                heapq.heappush(ready, (pending.remaining, pending.arrival, pending.seq, pending))
+            else:
+                ready.append(pending)
+            pending = pull()
+
+        # Finish
+        if current is not None and current.remaining == 0:
+            yield (time, FINISHED, current.name, 0)
+            current = None
+
+        # Preemption: quantum used up, or a shorter job waiting
+        if current is not None:
+            if slice_limit and slice_used == slice_limit:
+                yield (time, PREEMPTED, current.name, 0)
+                ready.append(current)
+                current = None
+            elif preemptive and ready and ready[0][:3] < (current.remaining, current.arrival, current.seq):
+                yield (time, PREEMPTED, current.name, 0)
+                heapq.heappush(ready, (current.remaining, current.arrival, current.seq, current))
+                current = None
+
+        # Selection
+        if current is None and ready:
+            current = heapq.heappop(ready)[3] if preemptive else ready.popleft()
+            slice_used = 0
+            yield (time, SELECTED, current.name, current.remaining)
+
+        next_time = horizon
+        if pending is not None:
+            next_time = min(next_time, pending.arrival)
+
+        if current is None:
+            if next_time == math.inf:
+                return  # input exhausted and nothing left to run
+            yield (time, IDLE, None, next_time)
+        elif current.remaining == 0:
+            next_time = time  # a zero burst finishes where it started
+        else:
+            next_time = min(next_time, time + current.remaining)
+            if slice_limit:
+                next_time = min(next_time, time + slice_limit - slice_used)
+            current.remaining -= next_time - time
+            slice_used += next_time - time
+        time = next_time
+
+    if current is not None and current.remaining == 0:
+        yield (horizon, FINISHED, current.name, 0)
+
+# What-if re-simulation
+
+class _Rejoined(Exception):
+    """Raised inside a what-if re-run once it is back in step with the base run."""
+    def __init__(self, snapshot, pointer):
+        self.snapshot = snapshot
+        self.pointer = pointer
+
+
+class _SnapshotRecorder:
+    """
+    Checkpoint stand-in for the base run of a WhatIf, keeping compact
+    snapshots in memory every `every` ticks.
+    """
+    def __init__(self, whatif, table, every):
+        self.whatif = whatif
+        self.table = table
+        self.every = every
+        self.state = None
+        self.next_tick = 0
+
+    def due(self, time):
+        return time >= self.next_tick
+
+    def save(self, time, state):
+        self.whatif.snapshots.append(self.whatif._snapshot(self.table, state))
+        self.next_tick = time + self.every
+
+
+class _Rerun:
+    """
+    Checkpoint stand-in for a what-if re-run: starts the engine from a
+    restored state and stops it once the state matches the base run again.
+    """
+    def __init__(self, whatif, table, state, horizon, check):
+        self.whatif = whatif
+        self.table = table
+        self.state = state
+        self.horizon = horizon
+        self.check = check
+
+    def due(self, time):
+        return time > self.horizon and time in self.whatif.by_time
+
+    def save(self, time, state):
+        snapshot = self.whatif.by_time[time]
+        if self.check(self.table, state, snapshot):
+            raise _Rejoined(snapshot, self.whatif._compact(state)[1])
+
+
+class WhatIf:
+    """
+    Answers "what if this job arrived later / ran shorter / was added or
+    removed" without re-simulating the whole workload.
+
+    A base run records snapshots of the engine state every snapshot_every
+    ticks. A what-if run restores the last snapshot taken before the first
+    changed arrival, simulates from there and stops as soon as its state
+    matches the base run at the same time after every change has arrived;
+    the rest of the results are taken from the base run.
+
+    Results are ProcessTables for the changed workload. Job ids are those
+    of the base workload, with added jobs appended; a removed job keeps
+    its row but never arrives.
+    """
+    def __init__(self, workload, snapshot_every=None):
+        self.workload = workload
+        self.algorithm = workload.algorithm
+        self.runfor = workload.runfor
+        self.snapshot_every = snapshot_every or max(1, workload.runfor // 64)
+        self.snapshots = []  # (time, pointer, engine state, in-flight columns)
+        self.last_resume = None  # time the last what-if run started from
+        self.last_rejoin = None  # time it rejoined the base run, if it did
+
+        self.base = ProcessTable(workload.names, workload.arrivals, workload.bursts)
+        self.base_order = self.base.arrival_order()
+        self.base_arrivals = self._arrivals(self.base_order, workload.arrivals)
+        self._run(workload, self.base, _SnapshotRecorder(self, self.base, self.snapshot_every))
+        self.times = [snapshot[0] for snapshot in self.snapshots]
+        self.by_time = {}
+        for snapshot in self.snapshots:
+            self.by_time.setdefault(snapshot[0], snapshot)
+
+    def index(self, name):
+        """Id of the first job called name."""
+        return list(self.workload.names).index(name)
+
+    def edit(self, job, arrival=None, burst=None):
+        return self.simulate({job: (arrival, burst)})
+
+    def add(self, name, arrival, burst):
+        return self.simulate(added=[(name, arrival, burst)])
+
+    def remove(self, job):
+        return self.simulate({job: None})
+
+    # Engine-specific views of the loop state each engine saves
+
+    def _arrivals(self, order, arrival):
+        if self.algorithm == "rr":
+            return order
+        return [i for i in order if 0 <= arrival[i] < self.runfor]
+
+    def _compact(self, state):
+        """(time, pointer, state without O(n) parts, in-flight ids)"""
+        if self.algorithm == "sjf":
+            time, next_arrival, ready_heap, current = state
+            inflight = [entry[2] for entry in ready_heap]
+            compact = (list(ready_heap), current)
+        elif self.algorithm == "rr":
+            time, process_idx, ready, _, current, quantum_counter = state
+            next_arrival = process_idx
+            inflight = list(ready)
+            compact = (list(ready), current, quantum_counter)
+        else:
+            next_arrival, _, time, _ = state
+            return time, next_arrival, (state[0], state[1], state[2]), []
+        if current is not None:
+            inflight.append(current)
+        return time, next_arrival, compact, inflight
+
+    def _expand(self, snapshot):
+        """Engine state to resume from, for a snapshot."""
+        time, pointer, compact, _ = snapshot
+        if self.algorithm == "sjf":
+            ready_heap, current = compact
+            return (time, pointer, list(ready_heap), current)
+        if self.algorithm == "rr":
+            ready, current, quantum_counter = compact
+            return (time, pointer, list(ready), [], current, quantum_counter)
+        return compact + (set(),)
+
+    def _snapshot(self, table, state):
+        time, pointer, compact, inflight = self._compact(state)
+        columns = {j: (table.remaining[j], table.start[j], table.finish[j], table.response[j]) for j in inflight}
+        return (time, pointer, compact, columns)
+
+    def _run(self, workload, table, recorder):
+        emit = EventCounter().emit
+        if self.algorithm == "fcfs":
+            fifo_scheduler(table, workload.runfor, emit, recorder)
+        elif self.algorithm == "sjf":
+            sjf_preemptive_scheduler(table, workload.runfor, emit, recorder)
+        else:
+            scheduler = RoundRobinScheduler(None, workload)
+            scheduler.table = table
+            scheduler.order = table.arrival_order()
+            scheduler._run_round_robin(emit, recorder)
+
+    def simulate(self, changes=None, added=()):
+        """
+        Simulates the base workload with changes applied and returns its
+        ProcessTable. changes maps a job id to (arrival, burst), either of
+        which may be None to keep the old value, or to None to remove the
+        job; added lists (name, arrival, burst) of new jobs.
+        """
+        changes = dict(changes or {})
+        base = self.base
+        n = len(base)
+
+        # The changed workload: edited columns and a patched arrival order
+        names = list(self.workload.names)
+        arrivals = array("q", base.arrival)
+        bursts = array("q", base.burst)
+        order = list(self.base_order)
+        touched = []  # (id, old arrival, new arrival)
+        for job, change in changes.items():
+            old = base.arrival[job]
+            if change is None:
+                new, burst = self.runfor, base.burst[job]  # never arrives
+            else:
+                new = old if change[0] is None else change[0]
+                burst = base.burst[job] if change[1] is None else change[1]
+            del order[bisect.bisect_left(order, (old, job), key=lambda i: (base.arrival[i], i))]
+            arrivals[job] = new
+            bursts[job] = burst
+            touched.append((job, old, new))
+        for name, arrival, burst in added:
+            touched.append((len(names), arrival, arrival))
+            names.append(sys.intern(name))
+            arrivals.append(arrival)
+            bursts.append(burst)
+        for job, _, _ in touched:
+            bisect.insort(order, job, key=lambda i: (arrivals[i], i))
+        workload = Workload(len(names), self.runfor, self.algorithm, self.workload.quantum, names, arrivals, bursts)
+        workload.order = order
+        new_arrivals = self._arrivals(order, arrivals)
+
+        if not touched:
+            self.last_resume, self.last_rejoin = None, None
+            return self._copy_base(workload)
+
+        diverge = min(min(old, new) for _, old, new in touched)
+        horizon = max(max(old, new) for _, old, new in touched)
+        removed = {job for job, change in changes.items() if change is None}
+        changed_ids = [job for job, _, _ in touched]
+
+        # Resume from the last snapshot at or before the divergence. The
+        # re-run only ever looks at jobs in flight or still to arrive, so it
+        # starts from a fresh table with just the in-flight jobs restored.
+        table = ProcessTable(names, arrivals, bursts, order)
+        state = None
+        first = []  # jobs in flight at the resume point
+        pointer = 0
+        self.last_resume = 0
+        position = bisect.bisect_right(self.times, diverge) - 1
+        if diverge >= 0 and position >= 0:
+            snapshot = self.snapshots[position]
+            self.last_resume, pointer = snapshot[0], snapshot[1]
+            state = self._expand(snapshot)
+            first = list(snapshot[3])
+            self._copy_jobs(table, snapshot[3].items())
+
+        def check(table, state, snapshot):
+            return self._rejoins(table, state, snapshot, new_arrivals, changed_ids, removed)
+
+        # Only jobs the re-run got to can differ from the base run
+        self.last_rejoin = None
+        try:
+            self._run(workload, table, _Rerun(self, table, state, horizon, check))
+            rerun = first + new_arrivals[pointer:] + changed_ids
+            keep = set()
+        except _Rejoined as rejoined:
+            snapshot = rejoined.snapshot
+            self.last_rejoin = snapshot[0]
+            rerun = first + new_arrivals[pointer:rejoined.pointer] + changed_ids
+            # Jobs still in flight match the base run, bar the response
+            # of a changed job whose arrival moved
+            keep = snapshot[3].keys() - set(changed_ids)
+            for j in snapshot[3].keys() & set(changed_ids):
+                table.start[j] = self.base.start[j]
+                table.finish[j] = self.base.finish[j]
+                table.remaining[j] = self.base.remaining[j]
+                if table.start[j] != UNSET:
+                    table.response[j] = table.start[j] - table.arrival[j]
+
+        result = self._copy_base(workload)
+        self._copy_jobs(result, (
+            (j, (table.remaining[j], table.start[j], table.finish[j], table.response[j]))
+            for j in rerun if j not in keep
+        ))
+        return result
+
+    def _copy_base(self, workload):
+        """The base run's results, with fresh rows for added jobs."""
+        table = workload.table()
+        for column in Checkpoint.COLUMNS:
+            getattr(table, column)[:len(self.base)] = getattr(self.base, column)
+        return table
+
+    @staticmethod
+    def _copy_jobs(table, rows):
+        """Writes (id, (remaining, start, finish, response)) rows into table."""
+        for j, (remaining, start, finish, response) in rows:
+            table.remaining[j] = remaining
+            table.start[j] = start
+            table.finish[j] = finish
+            table.response[j] = response
+
+    def _rejoins(self, table, state, snapshot, new_arrivals, changed_ids, removed):
+        """Whether the re-run's state matches the base run's from here on."""
+        time, pointer, compact, inflight = self._compact(state)
+        _, base_pointer, base_compact, base_columns = snapshot
+
+        # The next job to arrive must be the same one in both runs
+        upcoming = new_arrivals[pointer] if pointer < len(new_arrivals) else None
+        base_upcoming = self.base_arrivals[base_pointer] if base_pointer < len(self.base_arrivals) else None
+        if upcoming != base_upcoming:
+            return False
+
+        if self.algorithm == "fcfs":
+            # Every changed job must already have been scheduled in both runs
+            for j in changed_ids:
+                if j not in removed and table.start[j] == UNSET:
+                    return False
+                if j < len(self.base) and (self.base.start[j] == UNSET or self.base.start[j] >= time):
+                    return False
+            return True
+
+        if self.algorithm == "sjf":
+            if compact[1] != base_compact[1] or sorted(compact[0]) != sorted(base_compact[0]):
+                return False
+        elif compact != base_compact:
+            return False
+        columns = {j: (table.remaining[j], table.start[j], table.finish[j], table.response[j]) for j in inflight}
+        return columns == base_columns
+
+# Result cache: .out files keyed by the parsed workload
+
+DEFAULT_CACHE_SIZE = 256 << 20
+
+_code_digest = None
+_cache_warnings = set()  # cache directories already warned about
+
+
+def _source_digest():
+    # Results depend on this file, so editing it invalidates the cache
+    global _code_digest
+    if _code_digest is None:
+        with open(os.path.abspath(__file__), "rb") as f:
+            _code_digest = hashlib.sha256(f.read()).digest()
+    return _code_digest
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "scheduler-gpt")
+
+
+def parse_size(spec):
+    """Parses a byte count such as 1048576, 512K, 256M or 2G."""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    spec = spec.strip().upper().removesuffix("B")
+    try:
+        if spec and spec[-1] in units:
+            return int(float(spec[:-1]) * units[spec[-1]])
+        return int(spec)
+    except ValueError:
+        raise ValueError(f"invalid size '{spec}'")
+
+
+def workload_key(workload, **options):
+    """
+    Hash of a parsed workload, the options it is run with and this file,
+    so equivalent .in files share a key however they are formatted.
+    """
+    h = hashlib.sha256(_source_digest())
+    quantum = workload.quantum if workload.algorithm == "rr" else None
+    h.update(repr((workload.algorithm, quantum, workload.runfor, workload.process_count,
+                   sorted(options.items()))).encode())
+    h.update(memoryview(workload.arrivals).cast("B"))
+    h.update(memoryview(workload.bursts).cast("B"))
+    h.update("\0".join(workload.names).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of .out files, keyed by a hash of the parsed workload, so
+    whitespace, comments and directive order in the .in file do not matter.
+    The least recently used entries are evicted once the cache grows past
+    max_bytes.
+
+    The cache is only ever an optimization: an entry that cannot be read
+    is a miss, and a result that cannot be stored is skipped with a single
+    warning on stderr.
+    """
+    def __init__(self, directory=None, max_bytes=DEFAULT_CACHE_SIZE):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _warn(self, error):
+        # Once per directory and process; batch workers each get a pickled copy
+        if self.directory not in _cache_warnings:
+            _cache_warnings.add(self.directory)
+            print(f"Warning: not caching results in {self.directory}: {error}", file=sys.stderr)
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key + ".out")
+
+    def get(self, key, output_file):
+        """Copies a cached result to output_file; returns False on a miss."""
+        entry = self._entry(key)
+        try:
+            os.utime(entry)  # mark as recently used
+            shutil.copyfile(entry, output_file)
+        except OSError:
+            return False
+        return True
+
+    def put(self, key, output_file):
+        """
+        Stores output_file under key, unless it alone exceeds the size
+        cap, and evicts old entries if needed.
+        """
+        temp = self._entry(key) + f".{os.getpid()}.tmp"
+        try:
+            if os.path.getsize(output_file) <= self.max_bytes:
+                os.makedirs(self.directory, exist_ok=True)
+                # Copy then rename, so concurrent readers never see a partial entry
+                shutil.copyfile(output_file, temp)
+                os.replace(temp, self._entry(key))
+            self._evict()
+        except OSError as e:
+            self._warn(e)
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as it:
+                return [(e.stat().st_mtime, e.stat().st_size, e.path) for e in it if e.name.endswith(".out")]
+        except OSError:
+            return []
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # another process evicted it first
+            total -= size
 
-            for name in unfinished:
-                f.write(f"{name} did not finish\n")
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self._warn(e)
+
+def output_path(input_file):
+    """x.in -> x.out, compressed like the input: x.in.gz -> x.out.gz."""
+    base, compression = split_compression(input_file)
+    return os.path.splitext(base)[0] + ".out" + compression
+
+
+def simulate_file(input_file, idle_spans=False, profile=NULL_PROFILER, cache=None, checkpoint=None,
+                  stats=False, per_job=True, trace=None, records=None):
+    """
+    Parses input_file once, runs the scheduler it asks for and writes the
+    .out file next to it. Raises WorkloadError for a bad input file.
+    With a ResultCache, a workload simulated before is copied from the
+    cache instead. With a Checkpoint, the run saves its progress and can
+    pick up from an earlier, interrupted run. stats adds the aggregate
+    RunStats block to the .out file; per_job=False leaves out the
+    per-job lines. trace names a file to write a TraceWriter timeline to,
+    and records a RecordWriter format for per-job and event files.
+    """
+    with profile.phase("parse"):
+        workload = load_workload(input_file)
+    output_file = output_path(input_file)
+
+    if cache is not None or checkpoint is not None:
+        key = workload_key(
+            workload, idle_spans=idle_spans, stats=stats, per_job=per_job,
+            compression=split_compression(output_file)[1],
+        )
+    if cache is not None and cache.get(key, output_file):
+        return
+    if checkpoint is not None:
+        checkpoint.key = key
+
+    options = dict(
+        idle_spans=idle_spans, profile=profile, checkpoint=checkpoint, stats=stats, per_job=per_job, trace=trace,
+        records=records,
+    )
+    if workload.algorithm == "fcfs":
+        run_fifo_scheduler(workload, output_file, **options)
+    elif workload.algorithm == "sjf":
+        run_sjf_scheduler(workload, output_file, **options)
+    elif workload.algorithm == "rr":
+        simulate_round_robin_scheduler(input_file, workload, **options)
+
+    if cache is not None:
+        cache.put(key, output_file)
+
+# Batch mode: many .in files on a process pool
+
+def collect_inputs(paths):
+    """
+    Expands directories (searched recursively for *.in, compressed or not)
+    and glob patterns into a sorted list of input files. Plain file names
+    are kept as given.
+    """
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for suffix in ("", *COMPRESSORS):
+                files.update(glob.glob(os.path.join(path, "**", "*.in" + suffix), recursive=True))
+        elif glob.has_magic(path):
+            files.update(glob.glob(path, recursive=True))
+        else:
+            files.add(path)
+    return sorted(files)
 
+
+def _simulate_batch_file(input_file, idle_spans, cache, stats, per_job, records):
+    """
+    Worker for run_batch. Never raises: a bad file is reported as an error
+    string so it cannot take the rest of the batch down with it.
+    """
+    started = perf_counter()
+    error = None
+    try:
+        simulate_file(input_file, idle_spans, cache=cache, stats=stats, per_job=per_job, records=records)
+    except WorkloadError as e:
+        error = str(e)
+    except SystemExit as e:
+        error = f"exited with status {e.code}"
     except Exception as e:
-        print(f"Error: could not write to output file '{output_filename}': {e}", file=sys.stderr)
-        sys.exit(1)
+        error = f"{type(e).__name__}: {e}"
+    return input_file, error, perf_counter() - started
+
+
+def run_batch(input_files, jobs=None, idle_spans=False, cache=None, stats=False, per_job=True, records=None):
+    """
+    Simulates every file on a pool of jobs worker processes (one per CPU by
+    default). Returns (input_file, error or None, seconds) per file, in
+    input order.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    # Hand out files in chunks so thousands of small workloads don't pay
+    # one round trip to the pool each
+    chunksize = max(1, len(input_files) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(
+            _simulate_batch_file, input_files, repeat(idle_spans), repeat(cache), repeat(stats), repeat(per_job),
+            repeat(records), chunksize=chunksize,
+        ))
+
+
+def print_batch_summary(results, wall_time, out=sys.stdout):
+    failures = [(name, error) for name, error, _ in results if error is not None]
+    for name, error in failures:
+        print(f"FAILED {name}: {error}", file=out)
+
+    cpu_time = sum(seconds for _, _, seconds in results)
+    print(
+        f"{len(results)} files, {len(results) - len(failures)} ok, {len(failures)} failed "
+        f"in {wall_time:.2f}s ({cpu_time:.2f}s simulating)",
+        file=out,
+    )
+    slowest = sorted(results, key=lambda r: r[2], reverse=True)[:5]
+    for name, _, seconds in slowest:
+        print(f"  {seconds:8.3f}s  {name}", file=out)
+
+# Simulation service: workloads over HTTP, results as NDJSON
+
+SERVE_MAX_BODY = 16 << 20
+SERVE_CHUNK_SIZE = 1 << 16
+
+
+def workload_from_json(data):
+    """
+    Builds a Workload from a JSON object such as
+    {"use": "rr", "quantum": 2, "runfor": 20,
+     "processes": [{"name": "A", "arrival": 0, "burst": 5}]}
+    with the same checks as parse_workload.
+    """
+    if not isinstance(data, dict):
+        _parse_error("Workload must be a JSON object")
+
+    def integer(value, parameter):
+        # The columns are int64, so larger values would fail in array()
+        if type(value) is not int or not INT64_MIN <= value <= INT64_MAX:
+            _parse_error(f"Invalid {parameter} value")
+        return value
+
+    processes = data.get("processes")
+    if not isinstance(processes, list):
+        _parse_error("Missing parameter processes")
+    if "runfor" not in data:
+        _parse_error("Missing parameter runfor")
+    if "use" not in data:
+        _parse_error("Missing parameter use")
+
+    runfor = integer(data["runfor"], "runfor")
+    algorithm = str(data["use"]).lower()
+    quantum = integer(data["quantum"], "quantum") if data.get("quantum") is not None else None
+    process_count = integer(data.get("processcount", len(processes)), "processcount")
+
+    names = []
+    arrivals = array("q")
+    bursts = array("q")
+    for process in processes:
+        if not isinstance(process, dict):
+            _parse_error("Each process must be a JSON object")
+        for key in ("name", "arrival", "burst"):
+            if key not in process:
+                _parse_error(f"Missing parameter {key}")
+        names.append(sys.intern(str(process["name"])))
+        arrivals.append(integer(process["arrival"], "arrival"))
+        bursts.append(integer(process["burst"], "burst"))
+
+    if algorithm not in {"fcfs", "sjf", "rr"}:
+        _parse_error(f"Unsupported algorithm '{algorithm}'")
+    if algorithm == "rr" and quantum is None:
+        _parse_error("Missing quantum parameter when use is 'rr'")
+    if process_count != len(names):
+        _parse_error("processcount does not match number of processes defined")
+
+    return Workload(process_count, runfor, algorithm, quantum, names, arrivals, bursts)
+
+
+def simulate_workload(workload, emit):
+    """Runs the workload's own algorithm and returns the filled ProcessTable."""
+    if workload.algorithm == "fcfs":
+        table = workload.table()
+        fifo_scheduler(table, workload.runfor, emit)
+    elif workload.algorithm == "sjf":
+        table = workload.table()
+        sjf_preemptive_scheduler(table, workload.runfor, emit)
+    else:
+        scheduler = RoundRobinScheduler(None, workload)
+        scheduler._run_round_robin(emit)
+        table = scheduler.table
+    return table
+
+
+def _error_body(message):
+    return (json.dumps({"error": message}) + "\n").encode()
+
+
+class _Cancelled(Exception):
+    """Raised in a service worker once its client has gone away."""
+
+
+# Pool worker side of the service. Each request in flight holds a slot;
+# slot i streams through the write end of pipe i and stops early once
+# _service_cancelled[i] is set. Both are made before the workers start.
+_service_channels = None
+_service_cancelled = None
+
+
+def _init_service_worker(channels, cancelled):
+    global _service_channels, _service_cancelled
+    _service_channels = channels
+    _service_cancelled = cancelled
+
+
+class _ChannelWriter:
+    """
+    Text stream for a service worker. Output is collected until it reaches
+    SERVE_CHUNK_SIZE; from then on it is sent through the slot's pipe a
+    chunk at a time, and a full pipe holds the worker back until the
+    client catches up. A response that never gets that far is returned
+    whole by close() instead, without touching the pipe.
+    """
+    def __init__(self, slot):
+        self.slot = slot
+        self.parts = []
+        self.size = 0
+        self.streaming = False
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= SERVE_CHUNK_SIZE:
+            self.flush()
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        if self.size < SERVE_CHUNK_SIZE and not self.streaming:
+            return
+        if _service_cancelled[self.slot]:
+            raise _Cancelled
+        if self.parts:
+            _service_channels[self.slot].send_bytes("".join(self.parts).encode())
+            self.parts = []
+            self.size = 0
+        self.streaming = True
+
+    def close(self):
+        """The whole body if nothing was streamed, else None after sending the rest."""
+        if self.streaming:
+            self.flush()
+            return None
+        return "".join(self.parts).encode()
+
+
+def _parse_request(body, content_type):
+    if content_type.startswith("application/json"):
+        try:
+            return workload_from_json(json.loads(body))
+        except ValueError as e:
+            raise WorkloadError(f"Invalid JSON: {e}")
+    return parse_workload(body.decode("utf-8", "replace").splitlines())
+
+
+def _serve_simulation(body, content_type, with_events, slot):
+    """
+    Pool worker for the service: parses one request body, simulates it and
+    returns (HTTP status, body). The NDJSON is built here so the event loop
+    only moves bytes. Events and jobs are the same RecordWriter records as
+    --format jsonl writes, followed by a summary line. A response larger
+    than SERVE_CHUNK_SIZE is streamed through the slot's pipe while it is
+    simulated and None is returned as its body; an error after streaming
+    started ends the stream with an error line.
+    """
+    try:
+        workload = _parse_request(body, content_type)
+    except WorkloadError as e:
+        return 400, _error_body(str(e))
+    except Exception as e:
+        return 500, _error_body(f"{type(e).__name__}: {e}")
+
+    out = _ChannelWriter(slot)
+    try:
+        recorder = RecordWriter("jsonl", workload.names, out, out)
+        table = simulate_workload(workload, recorder.emit if with_events else EventCounter().emit)
+        recorder.write_jobs(table)
+
+        finished = sum(1 for i in range(len(table)) if table.finish[i] != UNSET)
+        out.write(json.dumps({"summary": {
+            "algorithm": workload.algorithm,
+            "runfor": workload.runfor,
+            "finished": finished,
+            "unfinished": len(table) - finished,
+        }}, separators=(",", ":")) + "\n")
+        return 200, out.close()
+    except _Cancelled:
+        return 200, None
+    except Exception as e:
+        if not out.streaming:
+            return 500, _error_body(f"{type(e).__name__}: {e}")
+        out.parts = [_error_body(f"{type(e).__name__}: {e}").decode()]
+        try:
+            out.flush()
+        except _Cancelled:
+            pass
+        return 200, None
+
+
+class SimulationService:
+    """
+    Minimal HTTP/1.1 front end for the simulator.
+
+    POST /simulate takes a workload in the .in syntax, or as JSON when the
+    Content-Type is application/json, and answers with NDJSON: one line per
+    event (leave them out with ?events=0), one per process and a summary.
+    The NDJSON is streamed while the workload is simulated. A bad workload
+    gets 400 and any other failure 500. GET /health reports the requests
+    in flight.
+
+    At most max_inflight requests are simulated or queued for the pool at
+    a time, each holding one of as many slots; requests beyond that get 503
+    straight away, so a slow pool pushes back on clients instead of piling
+    up work. A slot owns a pipe that large responses stream through, made
+    once when the pool starts; small responses come back with the result.
+    """
+    def __init__(self, jobs=None, max_inflight=None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.max_inflight = max_inflight or self.jobs * 8
+        self.executor = None
+        self.channels = []  # read end of each slot's pipe
+        self.cancelled = None
+        self.free = []  # slots not in use
+
+    @property
+    def inflight(self):
+        return self.max_inflight - len(self.free)
+
+    async def serve(self, address):
+        pipes = [Pipe(duplex=False) for _ in range(self.max_inflight)]
+        self.channels = [reader for reader, _ in pipes]
+        self.cancelled = RawArray("b", self.max_inflight)
+        self.free = list(range(self.max_inflight))
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.jobs, initializer=_init_service_worker,
+            initargs=([writer for _, writer in pipes], self.cancelled),
+        )
+        # Shut the pool down on SIGTERM too, not just Ctrl-C
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:
+            pass  # no signal handlers in this event loop (Windows)
+        try:
+            # Start the workers before accepting connections; workers forked
+            # later would inherit, and hold open, the client's socket
+            await asyncio.get_running_loop().run_in_executor(self.executor, int)
+            if address.startswith("unix:"):
+                server = await asyncio.start_unix_server(self.handle, address[len("unix:"):])
+            else:
+                host, _, port = address.rpartition(":")
+                server = await asyncio.start_server(self.handle, host or "127.0.0.1", int(port))
+            for sock in server.sockets:
+                print(f"Serving on {sock.getsockname()}", file=sys.stderr)
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+            for reader, writer in pipes:
+                reader.close()
+                writer.close()
+
+    async def handle(self, reader, writer):
+        try:
+            while await self.handle_request(reader, writer):
+                pass
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass  # client gone, or the service is shutting down
+        except ValueError:
+            # A malformed request line or header
+            try:
+                await self.respond(writer, 400, _error_body("Malformed request"), False)
+            except ConnectionError:
+                pass
+        except Exception as e:
+            print(f"Error serving request: {type(e).__name__}: {e}", file=sys.stderr)
+        finally:
+            writer.close()
+
+    async def handle_request(self, reader, writer):
+        """Serves one request; returns whether to keep the connection open."""
+        request_line = await reader.readline()
+        if not request_line:
+            return False
+        method, target, version = request_line.decode("latin-1").split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        length = int(headers.get("content-length", 0))
+        if length > SERVE_MAX_BODY:
+            await self.respond(writer, 413, b'{"error": "Request body too large"}\n', False)
+            return False
+        body = await reader.readexactly(length)
+
+        url = urlsplit(target)
+        if method == "GET" and url.path == "/health":
+            payload = json.dumps({"ok": True, "inflight": self.inflight, "limit": self.max_inflight})
+            await self.respond(writer, 200, payload.encode() + b"\n", keep_alive)
+        elif method == "POST" and url.path == "/simulate":
+            if not self.free:
+                await self.respond(writer, 503, b'{"error": "Too many requests in flight"}\n', keep_alive)
+                return keep_alive
+            with_events = parse_qs(url.query).get("events", ["1"])[0] not in ("0", "false")
+            content_type = headers.get("content-type", "text/plain")
+            return await self.simulate(writer, body, content_type, with_events, keep_alive, version == "HTTP/1.1")
+        else:
+            await self.respond(writer, 404, b'{"error": "Not found"}\n', keep_alive)
+        return keep_alive
+
+    async def simulate(self, writer, body, content_type, with_events, keep_alive, chunked):
+        """
+        Simulates one workload on the pool, in a free slot, and answers with
+        the worker's result, or streams the NDJSON to the client as the
+        worker produces it. Returns whether to keep the connection open.
+        """
+        loop = asyncio.get_running_loop()
+        slot = self.free.pop()
+        channel = self.channels[slot]
+        future = loop.run_in_executor(self.executor, _serve_simulation, body, content_type, with_events, slot)
+        finished = False
+        try:
+            chunk = await self._receive(channel, future)
+            if chunk is None:
+                finished = True
+                try:
+                    status, payload = future.result()
+                except Exception as e:
+                    print(f"Simulation failed: {type(e).__name__}: {e}", file=sys.stderr)
+                    await self.respond(writer, 500, _error_body("Simulation failed"), False)
+                    return False
+                await self.respond(writer, status, payload, keep_alive)
+                return keep_alive
+
+            # Without chunked encoding (HTTP/1.0) the end of the body is the
+            # end of the connection
+            keep_alive = keep_alive and chunked
+            writer.write(self._head(200, keep_alive, "Transfer-Encoding: chunked" if chunked else None))
+            while chunk is not None:
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunked else chunk)
+                await writer.drain()
+                chunk = await self._receive(channel, future)
+            finished = True
+            if future.exception() is not None:
+                # Leave the chunked body unterminated so the client sees it broke
+                print(f"Simulation failed: {future.exception()!r}", file=sys.stderr)
+                return False
+            if chunked:
+                writer.write(b"0\r\n\r\n")
+            await writer.drain()
+            return keep_alive
+        finally:
+            if finished:
+                self.free.append(slot)
+            else:
+                # The client went away: stop the worker, and drain its pipe
+                # so it is never left blocked, before the slot is reused
+                self.cancelled[slot] = 1
+                loop.create_task(self._discard(slot, future))
+
+    async def _receive(self, channel, future):
+        """Next chunk a worker streamed through channel, or None once it has returned."""
+        loop = asyncio.get_running_loop()
+        while not channel.poll():
+            if future.done():
+                return None
+            readable = loop.create_future()
+            loop.add_reader(channel.fileno(), lambda: readable.done() or readable.set_result(None))
+            try:
+                await asyncio.wait((readable, future), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                loop.remove_reader(channel.fileno())
+        return channel.recv_bytes()
+
+    async def _discard(self, slot, future):
+        try:
+            while await self._receive(self.channels[slot], future) is not None:
+                pass
+        finally:
+            self.cancelled[slot] = 0
+            self.free.append(slot)
+
+    def _head(self, status, keep_alive, *extra):
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                   500: "Internal Server Error", 503: "Service Unavailable"}
+        head = [f"HTTP/1.1 {status} {reasons[status]}"]
+        head.append("Content-Type: " + ("application/x-ndjson" if status == 200 else "application/json"))
+        head.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+        head.extend(line for line in extra if line)
+        return ("\r\n".join(head) + "\r\n\r\n").encode()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        extra = "Retry-After: 1" if status == 503 else None
+        writer.write(self._head(status, keep_alive, extra, f"Content-Length: {len(payload)}") + payload)
+        await writer.drain()
+
+# Monte Carlo: randomized workloads generated in memory, simulated in replicas
+
+ARRIVAL_PROCESSES = ("poisson", "mmpp", "diurnal")
+BURST_DISTRIBUTIONS = ("exponential", "lognormal", "pareto")
+
+# Two-state Markov-modulated Poisson arrivals: a busy state at MMPP_HIGH and
+# a quiet state at MMPP_LOW times the mean rate, each lasting MMPP_SOJOURN
+# mean gaps on average, so the long-run rate is the mean rate
+MMPP_HIGH = 1.8
+MMPP_LOW = 0.2
+MMPP_SOJOURN = 50
+
+# Diurnal arrivals: rate * (1 + DIURNAL_AMPLITUDE * sin(2 pi t / period)),
+# with one period every DIURNAL_PERIOD mean gaps
+DIURNAL_AMPLITUDE = 0.8
+DIURNAL_PERIOD = 1000
+
+LOGNORMAL_SIGMA = 1.0
+PARETO_ALPHA = 2.5
+
+MONTE_CARLO_METRICS = (
+    "wait_mean", "wait_p99", "turnaround_mean", "turnaround_p99",
+    "response_mean", "response_p99", "utilization", "throughput",
+)
+
+# Two-sided 95% Student t critical values for 1 to 30 degrees of freedom
+T_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+
+def _arrival_times(rng, process, count, rate):
+    """count increasing arrival times from the given process at mean rate."""
+    times = []
+    t = 0.0
+    if process == "poisson":
+        for _ in range(count):
+            t += rng.expovariate(rate)
+            times.append(t)
+    elif process == "mmpp":
+        busy = True
+        switch = rng.expovariate(rate / MMPP_SOJOURN)
+        while len(times) < count:
+            t += rng.expovariate(rate * (MMPP_HIGH if busy else MMPP_LOW))
+            if t >= switch:
+                # Gaps are memoryless, so the next one starts over in the new state
+                t = switch
+                busy = not busy
+                switch = t + rng.expovariate(rate / MMPP_SOJOURN)
+                continue
+            times.append(t)
+    elif process == "diurnal":
+        # Thinning: draw at the peak rate, keep each arrival with
+        # probability rate(t) / peak
+        period = DIURNAL_PERIOD / rate
+        peak = rate * (1 + DIURNAL_AMPLITUDE)
+        while len(times) < count:
+            t += rng.expovariate(peak)
+            if rng.random() * peak < rate * (1 + DIURNAL_AMPLITUDE * math.sin(2 * math.pi * t / period)):
+                times.append(t)
+    else:
+        raise ValueError(f"unknown arrival process '{process}'")
+    return times
+
+
+def _bursts(rng, distribution, count, mean):
+    """count bursts of at least one tick from the given distribution."""
+    if distribution == "exponential":
+        draw = lambda: rng.expovariate(1 / mean)
+    elif distribution == "lognormal":
+        mu = math.log(mean) - LOGNORMAL_SIGMA ** 2 / 2
+        draw = lambda: rng.lognormvariate(mu, LOGNORMAL_SIGMA)
+    elif distribution == "pareto":
+        scale = mean * (PARETO_ALPHA - 1) / PARETO_ALPHA
+        draw = lambda: scale * rng.paretovariate(PARETO_ALPHA)
+    else:
+        raise ValueError(f"unknown burst distribution '{distribution}'")
+    return array("q", (max(1, round(draw())) for _ in range(count)))
+
+
+def generate_workload(size, algorithm="fcfs", quantum=None, arrivals="poisson", bursts="exponential",
+                      load=0.8, mean_burst=10, seed=0):
+    """
+    Builds a random Workload of size jobs in memory. Arrivals come from
+    one of ARRIVAL_PROCESSES at the rate that keeps the CPU busy a load
+    fraction of the time, bursts from one of BURST_DISTRIBUTIONS with the
+    given mean. runfor leaves room for every job to finish. The same seed
+    gives the same workload, whatever the algorithm.
+    """
+    if algorithm not in {"fcfs", "sjf", "rr"}:
+        raise ValueError(f"unknown algorithm '{algorithm}'")
+    if algorithm == "rr" and (quantum is None or quantum < 1):
+        raise ValueError("Round Robin needs a quantum of at least 1")
+    if size < 1 or load <= 0 or mean_burst <= 0:
+        raise ValueError("size, load and mean burst must be positive")
+
+    rng = random.Random(seed)
+    arrival = array("q", map(int, _arrival_times(rng, arrivals, size, load / mean_burst)))
+    burst = _bursts(rng, bursts, size, mean_burst)
+    names = [sys.intern(f"P{i}") for i in range(size)]
+    runfor = arrival[-1] + sum(burst) + 1
+    return Workload(size, runfor, algorithm, quantum, names, arrival, burst)
+
+
+def confidence_interval(values):
+    """Mean and 95% confidence half-width (Student t) of replica results."""
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return mean, math.nan
+    df = n - 1
+    # Past the table, the first-order expansion of t around the normal 1.96
+    t = T_95[df - 1] if df <= len(T_95) else 1.96 + (1.96 ** 3 + 1.96) / (4 * df)
+    variance = sum((v - mean) ** 2 for v in values) / df
+    return mean, t * math.sqrt(variance / n)
+
+
+def _monte_carlo_replica(task):
+    config, seed = task
+    workload = generate_workload(
+        config["size"], config["algorithm"], config["quantum"], config["arrivals"], config["bursts"],
+        config["load"], config.get("mean_burst", 10), seed,
+    )
+    stats = RunStats(workload.runfor)
+    table = simulate_workload(workload, stats.emit)
+    # runfor leaves room for the worst case; measure up to the last finish
+    # instead, so the idle tail does not dilute utilization and throughput
+    makespan = max(table.finish)
+    stats.idle_ticks -= workload.runfor - makespan
+    stats.runfor = makespan
+    stats.add_table(table)
+    return stats.row()
+
+
+def monte_carlo(configs, replicas, jobs=None, seed=0):
+    """
+    Simulates replicas random workloads for each configuration (a dict of
+    generate_workload arguments: size, algorithm, quantum, arrivals,
+    bursts, load and optionally mean_burst) on a process pool. Returns,
+    per configuration, a dict of metric -> (mean, 95% half-width) over the
+    replicas for MONTE_CARLO_METRICS.
+
+    Replica r of configurations that differ only in algorithm or quantum
+    sees the same workload, so algorithms are compared on identical load.
+    """
+    tasks = []
+    for config in configs:
+        workload_seed = (seed, config["size"], config["arrivals"], config["bursts"], config["load"],
+                         config.get("mean_burst", 10))
+        tasks.extend((config, "-".join(map(str, workload_seed + (r,)))) for r in range(replicas))
+
+    jobs = min(jobs or os.cpu_count() or 1, max(1, len(tasks)))
+    if jobs == 1:
+        rows = [_monte_carlo_replica(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            rows = list(executor.map(_monte_carlo_replica, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+
+    results = []
+    for i in range(len(configs)):
+        replica_rows = rows[i * replicas:(i + 1) * replicas]
+        results.append({
+            metric: confidence_interval([row[metric] for row in replica_rows]) for metric in MONTE_CARLO_METRICS
+        })
+    return results
+
+
+def print_monte_carlo(configs, results, replicas, out=sys.stdout):
+    for config, summary in zip(configs, results):
+        label = config["algorithm"]
+        if config["algorithm"] == "rr":
+            label += f" q={config['quantum']}"
+        print(
+            f"{label}, {config['arrivals']} arrivals, {config['bursts']} bursts, load {config['load']:.2f}: "
+            f"{replicas} replicas of {config['size']} jobs",
+            file=out,
+        )
+        for metric in MONTE_CARLO_METRICS:
+            mean, half_width = summary[metric]
+            print(f"  {metric.replace('_', ' '):<16} {mean:>12.4f} +/- {half_width:.4f}", file=out)
+        print(file=out)
 
 # Made with ChatGPT. Link: https://chatgpt.com/share/68d96a4b-268c-8009-a596-e32ea23dbc36
 
+def positive(convert):
+    """An argparse type= that converts with convert and rejects values <= 0."""
+    def parse(text):
+        try:
+            value = convert(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid {convert.__name__} value: '{text}'")
+        if not value > 0:
+            raise argparse.ArgumentTypeError(f"must be positive: '{text}'")
+        return value
+    parse.__name__ = convert.__name__
+    return parse
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python script.py <input_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Simulate FCFS, preemptive SJF or Round Robin scheduling of a .in workload."
+    )
+    parser.add_argument("inputs", nargs="*", metavar="input_file")
+    parser.add_argument(
+        "--idle-spans",
+        action="store_true",
+        help="write each stretch of idle ticks as a single 'Idle until' line",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="add a summary to the .out file: wait, turnaround and response percentiles, "
+             "throughput, CPU utilization and context switches",
+    )
+    parser.add_argument(
+        "--no-per-job",
+        action="store_true",
+        help="leave the per-job wait/turnaround/response lines out of the .out file",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="treat the inputs as files, directories or glob patterns and simulate them all in parallel",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes for --batch, --sweep-quantum and --monte-carlo (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--sweep-quantum",
+        metavar="QUANTA",
+        help="instead of writing a .out file, simulate Round Robin for each quantum "
+             "(e.g. 1,2,5 or 1:20 or 5:100:5) and print a metrics table",
+    )
+    parser.add_argument(
+        "--monte-carlo",
+        type=int,
+        metavar="REPLICAS",
+        help="instead of reading input files, simulate REPLICAS random workloads per configuration "
+             "and print 95%% confidence intervals",
+    )
+    parser.add_argument(
+        "--algorithms",
+        default="fcfs,sjf,rr",
+        help="with --monte-carlo: comma-separated algorithms to compare",
+    )
+    parser.add_argument(
+        "--arrival-process",
+        default="poisson",
+        help=f"with --monte-carlo: comma-separated subset of {','.join(ARRIVAL_PROCESSES)}",
+    )
+    parser.add_argument(
+        "--burst-distribution",
+        default="exponential",
+        help=f"with --monte-carlo: comma-separated subset of {','.join(BURST_DISTRIBUTIONS)}",
+    )
+    parser.add_argument(
+        "--workload-size",
+        type=int,
+        default=1000,
+        help="with --monte-carlo: jobs per generated workload",
+    )
+    parser.add_argument(
+        "--load",
+        type=float,
+        default=0.8,
+        help="with --monte-carlo: fraction of the time the CPU is busy, on average",
+    )
+    parser.add_argument(
+        "--quantum",
+        type=int,
+        default=5,
+        help="with --monte-carlo: Round Robin quantum",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="with --monte-carlo: random seed; the same seed reproduces the same workloads",
+    )
+    parser.add_argument(
+        "--cpus",
+        type=int,
+        default=None,
+        help="simulate the workload on this many CPUs, each with its own run queue",
+    )
+    parser.add_argument(
+        "--balance",
+        choices=SMP_BALANCE,
+        default="steal",
+        help="with --cpus: idle CPUs steal from the longest queue, or all CPUs share one global queue",
+    )
+    parser.add_argument(
+        "--convert",
+        action="store_true",
+        help="convert the .in input to a binary .inb workload next to it instead of simulating it",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="run as a simulation service on HOST:PORT, :PORT or unix:PATH instead of reading input files",
+    )
+    parser.add_argument(
+        "--max-inflight",
+        type=int,
+        default=None,
+        help="with --serve: requests handled at once before answering 503 (default: 8 per worker)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="reuse the .out file of an identical earlier run from the result cache, and store new results there",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always simulate, without reading or writing the result cache (the default; overrides --cache)",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="empty the result cache before running (or on its own, with no input files)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help=f"result cache directory (default: {default_cache_dir()})",
+    )
+    parser.add_argument(
+        "--cache-size",
+        default=None,
+        help="evict least recently used results above this size, e.g. 512M (default: 256M)",
+    )
+    parser.add_argument(
+        "--checkpoint-ticks",
+        type=positive(int),
+        default=None,
+        metavar="TICKS",
+        help="save a checkpoint (next to the input, as .ckpt) every TICKS simulated ticks",
+    )
+    parser.add_argument(
+        "--checkpoint-seconds",
+        type=positive(float),
+        default=None,
+        metavar="SECONDS",
+        help="save a checkpoint every SECONDS of wall-clock time",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the input's checkpoint if it matches the workload, else start over",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="also write the schedule as Chrome trace-event JSON to FILE, for Perfetto or chrome://tracing",
+    )
+    parser.add_argument(
+        "--format",
+        choices=RECORD_FORMATS,
+        default=None,
+        help="also write per-job metrics and every event as JSON Lines or CSV, "
+             "to .jobs.FORMAT and .events.FORMAT files next to the .out file",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="report wall and CPU time per phase and scheduler counters on stderr",
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="FILE",
+        help="write the --profile report to FILE as JSON instead",
+    )
+    args = parser.parse_args()
+
+    if args.serve:
+        service = SimulationService(args.jobs, args.max_inflight)
+        try:
+            asyncio.run(service.serve(args.serve))
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        return
+
+    if args.monte_carlo is not None:
+        if args.monte_carlo < 1:
+            parser.error("--monte-carlo needs at least one replica")
+        configs = [
+            {"size": args.workload_size, "algorithm": algorithm, "quantum": args.quantum,
+             "arrivals": arrivals, "bursts": bursts, "load": args.load}
+            for arrivals in args.arrival_process.split(",")
+            for bursts in args.burst_distribution.split(",")
+            for algorithm in args.algorithms.split(",")
+        ]
+        try:
+            # Catch bad options here rather than in every worker
+            for config in configs:
+                generate_workload(1, config["algorithm"], config["quantum"], config["arrivals"], config["bursts"],
+                                  config["load"])
+            if args.workload_size < 1:
+                raise ValueError("--workload-size must be at least 1")
+        except ValueError as e:
+            parser.error(str(e))
+        results = monte_carlo(configs, args.monte_carlo, args.jobs, args.seed)
+        print_monte_carlo(configs, results, args.monte_carlo)
+        return
+
+    try:
+        cache_size = parse_size(args.cache_size) if args.cache_size else DEFAULT_CACHE_SIZE
+    except ValueError as e:
+        parser.error(str(e))
+    cache = ResultCache(args.cache_dir, cache_size)
+    if args.clear_cache:
+        cache.clear()
+        if not args.inputs:
+            return
+
+    if not args.inputs:
+        parser.error("an input file is required unless --serve is given")
+
+    profiling = args.profile or args.profile_json
+    if profiling and (args.batch or args.sweep_quantum):
+        parser.error("--profile applies to a single simulation, not --batch or --sweep-quantum")
+    if args.trace and (args.batch or args.sweep_quantum):
+        parser.error("--trace applies to a single simulation, not --batch or --sweep-quantum")
+    if args.format and args.sweep_quantum:
+        parser.error("--format does not apply to --sweep-quantum")
+    # A profiled, traced or recorded run has to simulate
+    if not args.cache or args.no_cache or profiling or args.trace or args.format:
+        cache = None
+
+    if args.batch:
+        input_files = collect_inputs(args.inputs)
+        started = perf_counter()
+        results = run_batch(
+            input_files, args.jobs, args.idle_spans, cache, args.stats, not args.no_per_job, args.format
+        )
+        print_batch_summary(results, perf_counter() - started)
+        if any(error is not None for _, error, _ in results):
+            sys.exit(1)
+        return
 
-    input_file = sys.argv[1]
+    if len(args.inputs) != 1:
+        parser.error("only one input file is allowed without --batch")
+    input_file = args.inputs[0]
 
     # Check file extension
-    if not input_file.endswith(".in"):
-        print("Error: Input file must have a .in extension")
+    if workload_extension(input_file) not in (".in", BINARY_EXTENSION):
+        print("Error: Input file must have a .in or .inb extension")
         sys.exit(1)
 
-    try:
-        with open(input_file, "r") as f:
-            # Read first line: store second string as numProcesses
-            first_line = f.readline().strip().split()
-            numProcesses = int(first_line[1])
-
-            # Read second line: store second string as timeUnits
-            second_line = f.readline().strip().split()
-            timeUnits = int(second_line[1])
-
-            # Read third line: store second string as algo
-            third_line = f.readline().strip().split()
-            algo = third_line[1].lower()
-
-            # Call the appropriate scheduling algorithm
-            if algo == "fcfs":
-                run_fifo_scheduler_from_file(input_file)
-            elif algo == "sjf":
-                run_sjf_scheduler_from_file(input_file)
-            elif algo == "rr":
-                simulate_round_robin_scheduler(input_file)
-            else:
-                sys.exit(1)
+    if args.convert:
+        if workload_extension(input_file) == BINARY_EXTENSION:
+            parser.error("--convert needs a .in input; this file is already binary")
+        try:
+            print(convert_workload(input_file))
+        except WorkloadError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
 
-    except (IndexError, ValueError) as e:
-        print(f"Error parsing input file: {e}")
-        sys.exit(1)
-    except FileNotFoundError:
-        print(f"File not found: {input_file}")
+    if args.sweep_quantum:
+        try:
+            quanta = parse_quanta(args.sweep_quantum)
+        except ValueError as e:
+            parser.error(str(e))
+        try:
+            workload = load_workload(input_file)
+        except WorkloadError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print_sweep_table(sweep_quantum(workload, quanta, args.jobs))
+        return
+
+    checkpoint = None
+    if args.checkpoint_ticks is not None or args.checkpoint_seconds is not None or args.resume:
+        if args.cpus is not None:
+            parser.error("checkpoints are not supported with --cpus")
+        if args.stats or args.trace or args.format:
+            # A resumed run would miss everything before the checkpoint
+            parser.error("checkpoints are not supported with --stats, --trace or --format")
+        if split_compression(input_file)[1]:
+            # Resuming cuts the .out file back, which a compressed stream cannot do
+            parser.error("checkpoints are not supported with compressed files")
+        checkpoint_file = os.path.splitext(input_file)[0] + ".ckpt"
+        checkpoint = Checkpoint(checkpoint_file, args.checkpoint_ticks, args.checkpoint_seconds, args.resume)
+
+    # Parse the file once and hand the workload to the selected scheduler
+    profile = Profiler() if profiling else NULL_PROFILER
+    try:
+        if args.cpus is not None:
+            if args.cpus < 1:
+                parser.error("--cpus must be at least 1")
+            with profile.phase("parse"):
+                workload = load_workload(input_file)
+            run_smp_scheduler(
+                workload, output_path(input_file), args.cpus, args.balance, profile, args.stats, not args.no_per_job,
+                args.trace, args.format,
+            )
+        else:
+            simulate_file(
+                input_file, args.idle_spans, profile, cache, checkpoint, args.stats, not args.no_per_job, args.trace,
+                args.format,
+            )
+    except WorkloadError as e:
+        print(f"Error: {e}")
         sys.exit(1)
 
+    if args.profile_json:
+        profile.write_json(args.profile_json)
+    elif args.profile:
+        profile.report()
+
 if __name__ == "__main__":
     main()
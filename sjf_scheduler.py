@@ -3,6 +3,7 @@
 
 import sys
 import os
+import heapq
 
 class Process:
     def __init__(self, name, arrival, burst):
@@ -114,6 +115,81 @@ def parse_input(input_lines):
 
 
 def sjf_preemptive_scheduler(processes, runtime, output_file):
+    # Jobs are visited in arrival order (input order breaks ties, as the
+    # arrival scan did), and the simulation jumps from one arrival or
+    # completion to the next instead of stepping every tick.
+    arrivals = sorted(
+        (i for i, p in enumerate(processes) if 0 <= p.arrival < runtime),
+        key=lambda i: processes[i].arrival,
+    )
+    next_arrival = 0
+
+    # Waiting jobs keyed by (remaining, arrival, input index): the same
+    # order min() over the ready queue picked. The running job is kept
+    # outside the heap and pushed back when it is preempted.
+    ready_heap = []
+    current = None
+
+    log = []
+    time = 0
+
+    while time < runtime:
+        # (1) Arrivals
+        while next_arrival < len(arrivals) and processes[arrivals[next_arrival]].arrival == time:
+            i = arrivals[next_arrival]
+            p = processes[i]
+            log.append(f"Time {time:3} : {p.name} arrived")
+            heapq.heappush(ready_heap, (p.remaining, p.arrival, i))
+            next_arrival += 1
+
+        # (2) Finishes
+        if current is not None and processes[current].finish_time == time:
+            log.append(f"Time {time:3} : {processes[current].name} finished")
+            current = None
+
+        # (3) Choose process
+        if ready_heap and (
+            current is None
+            or ready_heap[0] < (processes[current].remaining, processes[current].arrival, current)
+        ):
+            if current is not None:
+                p = processes[current]
+                heapq.heappush(ready_heap, (p.remaining, p.arrival, current))
+            current = heapq.heappop(ready_heap)[2]
+            p = processes[current]
+            if p.start_time is None:
+                p.start_time = time
+                p.response_time = time - p.arrival
+            log.append(f"Time {time:3} : {p.name} selected (burst {p.remaining:3})")
+
+        if next_arrival < len(arrivals):
+            next_event = processes[arrivals[next_arrival]].arrival
+        else:
+            next_event = runtime
+
+        if current is None:
+            for t in range(time, next_event):
+                log.append(f"Time {t:3} : Idle")
+            time = next_event
+            continue
+
+        # (4) Run until the next arrival or the current job's completion
+        p = processes[current]
+        if p.remaining > 0:
+            next_event = min(next_event, time + p.remaining)
+        p.remaining -= next_event - time
+        if p.remaining == 0:
+            p.finish_time = next_event
+        time = next_event
+
+    write_sjf_output(processes, runtime, log, output_file)
+
+
+def sjf_preemptive_scheduler_tick(processes, runtime, output_file):
+    """
+    Reference preemptive SJF engine that steps the simulation one tick at a
+    time. Kept to cross-check sjf_preemptive_scheduler; both write the same file.
+    """
     time = 0
     ready_queue = []
     current_process = None
@@ -160,6 +236,10 @@ def sjf_preemptive_scheduler(processes, runtime, output_file):
 
         time += 1
 
+    write_sjf_output(processes, runtime, log, output_file)
+
+
+def write_sjf_output(processes, runtime, log, output_file):
     log.append(f"Finished at time {runtime:3}")
     log.append("")
 
@@ -179,7 +259,7 @@ def sjf_preemptive_scheduler(processes, runtime, output_file):
             f.write(line + "\n")
 
 
-def run_sjf_scheduler_from_file(input_file):
+def run_sjf_scheduler_from_file(input_file, reference=False):
     if not input_file.endswith(".in"):
         print("Error: Input file must have .in extension")
         sys.exit(1)
@@ -192,4 +272,6 @@ def run_sjf_scheduler_from_file(input_file):
     processes, runfor, algo = parse_input(input_data)
 
     if algo == "sjf":
-        sjf_preemptive_scheduler(processes, runfor, output_file)
+        # reference=True runs the original tick-by-tick loop instead
+        scheduler = sjf_preemptive_scheduler_tick if reference else sjf_preemptive_scheduler
+        scheduler(processes, runfor, output_file)
@@ -0,0 +1,77 @@
+import importlib.util
+import os
+import random
+import sys
+from array import array
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_module(name, filename):
+    """Imports filename from the repository root as name; some file names are not valid module names."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_scheduler():
+    """Imports scheduler-gpt.py, whose file name is not a valid module name."""
+    return load_module("scheduler_gpt", "scheduler-gpt.py")
+
+
+def write_input(path, workload):
+    """Writes workload to path in the .in syntax."""
+    lines = [f"processcount {workload.process_count}", f"runfor {workload.runfor}", f"use {workload.algorithm}"]
+    if workload.quantum is not None:
+        lines.append(f"quantum {workload.quantum}")
+    for name, arrival, burst in zip(workload.names, workload.arrivals, workload.bursts):
+        lines.append(f"process name {name} arrival {arrival} burst {burst}")
+    lines.append("end")
+    path.write_text("\n".join(lines) + "\n")
+
+
+@pytest.fixture(scope="session")
+def sched():
+    return load_scheduler()
+
+
+@pytest.fixture
+def make_workload(sched):
+    """
+    Returns a function building a random Workload from a seed. quirks mixes
+    in zero bursts and arrivals before 0 or at runfor, which the engines
+    treat specially.
+    """
+    def make(seed, algorithm, jobs=30, runfor=300, quirks=False):
+        rng = random.Random(seed)
+        arrivals = array("q", (rng.randint(0, runfor - 1) for _ in range(jobs)))
+        bursts = array("q", (rng.randint(1, 20) for _ in range(jobs)))
+        if quirks:
+            for i in range(jobs):
+                r = rng.random()
+                if r < 0.05:
+                    bursts[i] = 0
+                elif r < 0.1:
+                    arrivals[i] = rng.choice([-1, runfor])
+        quantum = rng.randint(1, 6) if algorithm == "rr" else None
+        names = [f"P{i}" for i in range(jobs)]
+        return sched.Workload(jobs, runfor, algorithm, quantum, names, arrivals, bursts)
+    return make
+
+
+@pytest.fixture
+def record():
+    """Returns a list and an emit that appends every event to it as a tuple."""
+    def make():
+        events = []
+
+        def emit(time, event, job=-1, value=0, cpu=-1):
+            events.append((time, event, job, value, cpu))
+        return events, emit
+    return make
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from conftest import write_input
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.fixture
+def crashing_checkpoint(sched):
+    """A Checkpoint that raises Crash right after its saves-th save."""
+    class CrashingCheckpoint(sched.Checkpoint):
+        def __init__(self, path, every_ticks, saves, resume=False):
+            super().__init__(path, every_ticks, resume=resume)
+            self.saves = saves
+
+        def save(self, time, state):
+            super().save(time, state)
+            self.saves -= 1
+            if self.saves == 0:
+                raise Crash
+    return CrashingCheckpoint
+
+
+@pytest.mark.parametrize("idle_spans", [False, True])
+@pytest.mark.parametrize("algorithm", ["fcfs", "sjf", "rr"])
+@pytest.mark.parametrize("seed", range(5))
+def test_resumed_run_matches_uninterrupted_run(sched, make_workload, crashing_checkpoint, tmp_path, seed, algorithm,
+                                               idle_spans):
+    input_file = tmp_path / "workload.in"
+    output_file = tmp_path / "workload.out"
+    checkpoint_file = str(tmp_path / "workload.ckpt")
+    write_input(input_file, make_workload(seed, algorithm, jobs=40, runfor=400))
+
+    sched.simulate_file(str(input_file), idle_spans)
+    expected = output_file.read_bytes()
+    output_file.unlink()
+
+    every_ticks = 1 + seed * 3
+    with pytest.raises(Crash):
+        checkpoint = crashing_checkpoint(checkpoint_file, every_ticks, 3)
+        sched.simulate_file(str(input_file), idle_spans, checkpoint=checkpoint)
+    assert os.path.exists(checkpoint_file)
+    with pytest.raises(Crash):
+        checkpoint = crashing_checkpoint(checkpoint_file, every_ticks, 2, resume=True)
+        sched.simulate_file(str(input_file), idle_spans, checkpoint=checkpoint)
+
+    checkpoint = sched.Checkpoint(checkpoint_file, every_ticks, resume=True)
+    sched.simulate_file(str(input_file), idle_spans, checkpoint=checkpoint)
+    assert output_file.read_bytes() == expected
+    assert not os.path.exists(checkpoint_file)
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+
+@pytest.fixture
+def binary_workload(sched, tmp_path):
+    text = tmp_path / "c.in"
+    text.write_text(
+        "processcount 2\nrunfor 20\nuse fcfs\n"
+        "process name A arrival 0 burst 5\nprocess name B arrival 3 burst 4\nend\n"
+    )
+    binary = sched.convert_workload(str(text))
+    assert binary == str(tmp_path / "c.inb")
+    return tmp_path / "c.inb"
+
+
+def test_convert_workload_refuses_to_overwrite_its_input(sched, binary_workload):
+    before = binary_workload.read_bytes()
+    with pytest.raises(sched.WorkloadError):
+        sched.convert_workload(str(binary_workload))
+    with pytest.raises(sched.WorkloadError):
+        sched.convert_workload(str(binary_workload), str(binary_workload))
+    assert binary_workload.read_bytes() == before
+
+
+def test_convert_option_rejects_binary_input(binary_workload):
+    before = binary_workload.read_bytes()
+    result = subprocess.run(
+        [sys.executable, f"{ROOT}/scheduler-gpt.py", str(binary_workload), "--convert"],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 2
+    assert "--convert" in result.stderr
+    assert binary_workload.read_bytes() == before
@@ -0,0 +1,21 @@
+import pytest
+
+COLUMNS = ("remaining", "start", "finish", "response")
+
+
+@pytest.mark.parametrize("quirks", [False, True])
+@pytest.mark.parametrize("seed", range(20))
+def test_event_driven_fifo_matches_tick_engine(sched, make_workload, record, seed, quirks):
+    workload = make_workload(seed, "fcfs", jobs=seed % 7 * 5 + 1, runfor=40 + 20 * seed, quirks=quirks)
+
+    fast, fast_emit = record()
+    fast_table = workload.table()
+    sched.fifo_scheduler(fast_table, workload.runfor, fast_emit)
+
+    slow, slow_emit = record()
+    slow_table = workload.table()
+    sched.fifo_scheduler_tick(slow_table, workload.runfor, slow_emit)
+
+    assert fast == slow
+    for column in COLUMNS:
+        assert list(getattr(fast_table, column)) == list(getattr(slow_table, column)), column
@@ -0,0 +1,34 @@
+import re
+
+import pytest
+
+from conftest import write_input
+
+EVENT_LINE = re.compile(r"^[Tt]ime +(\d+) : (?!Simulator ended)")
+IDLE_SPAN = re.compile(r": Idle until +(\d+)$")
+
+
+@pytest.mark.parametrize("idle_spans", [False, True])
+@pytest.mark.parametrize("algorithm", ["fcfs", "sjf", "rr"])
+@pytest.mark.parametrize("seed", range(4))
+def test_counters_match_the_log(sched, make_workload, tmp_path, seed, algorithm, idle_spans):
+    # Few jobs over a long run, so there is plenty of idle time
+    input_file = tmp_path / "workload.in"
+    write_input(input_file, make_workload(seed, algorithm, jobs=8, runfor=200))
+    profile = sched.Profiler()
+    sched.simulate_file(str(input_file), idle_spans, profile)
+
+    lines = [line for line in (tmp_path / "workload.out").read_text().splitlines() if EVENT_LINE.match(line)]
+    idle_ticks = 0
+    for line in lines:
+        if line.endswith(": Idle"):
+            idle_ticks += 1
+        elif span := IDLE_SPAN.search(line):
+            idle_ticks += int(span.group(1)) - int(EVENT_LINE.match(line).group(1))
+
+    counters = profile.results()["counters"]
+    assert counters["events_logged"] == len(lines)
+    assert counters["dispatches"] == sum(" selected " in line for line in lines)
+    assert counters["idle_ticks"] == idle_ticks
+    assert idle_ticks > 0
+    assert "ticks" not in counters
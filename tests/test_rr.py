@@ -0,0 +1,30 @@
+import pytest
+
+from conftest import load_module, write_input
+
+ATTRIBUTES = ("remaining_time", "start_time", "finish_time", "wait_time", "turnaround_time", "response_time")
+
+
+@pytest.fixture(scope="module")
+def rr():
+    return load_module("rr_scheduler", "rr-scheduler.py")
+
+
+def state(processes):
+    return [(p.name, *(getattr(p, attribute) for attribute in ATTRIBUTES)) for p in processes]
+
+
+@pytest.mark.parametrize("quirks", [False, True])
+@pytest.mark.parametrize("seed", range(20))
+def test_event_driven_round_robin_matches_tick_engine(rr, make_workload, tmp_path, seed, quirks):
+    input_file = tmp_path / "workload.in"
+    write_input(input_file, make_workload(seed, "rr", jobs=seed % 7 * 5 + 1, runfor=40 + 20 * seed, quirks=quirks))
+    fast = rr.RoundRobinScheduler(str(input_file))
+    slow = rr.RoundRobinScheduler(str(input_file))
+
+    fast_finished, fast_remaining, fast_logs = fast._run_round_robin()
+    slow_finished, slow_remaining, slow_logs = slow._run_round_robin_tick()
+    assert fast_logs == slow_logs
+    assert state(fast_finished) == state(slow_finished)
+    assert state(fast_remaining) == state(slow_remaining)
+    assert state(fast.processes) == state(slow.processes)
@@ -0,0 +1,28 @@
+import pytest
+
+from conftest import load_module
+
+ATTRIBUTES = ("remaining", "start_time", "finish_time", "response_time")
+
+
+@pytest.fixture(scope="module")
+def sjf():
+    return load_module("sjf_scheduler", "sjf_scheduler.py")
+
+
+def run(engine, sjf, workload, output_file):
+    processes = [sjf.Process(*job) for job in zip(workload.names, workload.arrivals, workload.bursts)]
+    engine(processes, workload.runfor, str(output_file))
+    return processes
+
+
+@pytest.mark.parametrize("quirks", [False, True])
+@pytest.mark.parametrize("seed", range(20))
+def test_event_driven_sjf_matches_tick_engine(sjf, make_workload, tmp_path, seed, quirks):
+    workload = make_workload(seed, "sjf", jobs=seed % 7 * 5 + 1, runfor=40 + 20 * seed, quirks=quirks)
+    fast = run(sjf.sjf_preemptive_scheduler, sjf, workload, tmp_path / "fast.out")
+    slow = run(sjf.sjf_preemptive_scheduler_tick, sjf, workload, tmp_path / "slow.out")
+
+    assert (tmp_path / "fast.out").read_text() == (tmp_path / "slow.out").read_text()
+    for attribute in ATTRIBUTES:
+        assert [getattr(p, attribute) for p in fast] == [getattr(p, attribute) for p in slow], attribute
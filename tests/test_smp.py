@@ -0,0 +1,84 @@
+from array import array
+
+import pytest
+
+BALANCES = ("steal", "global")
+
+
+def slices(sched, events, runfor):
+    """(job, cpu, start, end) of every stretch a job ran, from an event list."""
+    running = {}
+    result = []
+    for time, event, job, value, cpu in events:
+        if event == sched.SELECTED:
+            assert cpu not in running, f"CPU {cpu} selected {job} while running {running.get(cpu)}"
+            running[cpu] = (job, time)
+        elif event in (sched.FINISHED, sched.PREEMPTED):
+            started_job, started = running.pop(cpu)
+            assert started_job == job
+            result.append((job, cpu, started, time))
+    result.extend((job, cpu, started, runfor) for cpu, (job, started) in running.items())
+    return result
+
+
+@pytest.mark.parametrize("balance", BALANCES)
+@pytest.mark.parametrize("algorithm", ["fcfs", "sjf", "rr"])
+@pytest.mark.parametrize("seed", range(10))
+def test_invariants(sched, make_workload, record, seed, algorithm, balance):
+    cpus = 2 + seed % 4
+    workload = make_workload(seed, algorithm, jobs=10 + 3 * seed, runfor=120, quirks=seed % 2 == 1)
+    table = workload.table()
+    events, emit = record()
+    busy, dispatches, steals = sched.smp_scheduler(
+        table, workload.runfor, algorithm, workload.quantum, cpus, balance, emit
+    )
+
+    times = [event[0] for event in events]
+    assert times == sorted(times), "log is not in time order"
+
+    ran = slices(sched, events, workload.runfor)
+    for i, (job, cpu, start, end) in enumerate(ran):
+        for other_job, other_cpu, other_start, other_end in ran[i + 1:]:
+            if start < other_end and other_start < end:
+                assert job != other_job, f"{job} ran on CPUs {cpu} and {other_cpu} at once"
+                assert cpu != other_cpu
+
+    work = [0] * len(table)
+    for job, cpu, start, end in ran:
+        work[job] += end - start
+    assert work == [table.burst[i] - table.remaining[i] for i in range(len(table))]
+    assert sum(busy) == sum(work)
+
+    idle = [0] * cpus
+    for time, event, job, value, cpu in events:
+        if event == sched.IDLE:
+            idle[cpu] += value - time
+    assert [idle[cpu] + busy[cpu] for cpu in range(cpus)] == [workload.runfor] * cpus
+
+
+@pytest.mark.parametrize("balance", BALANCES)
+@pytest.mark.parametrize("algorithm", ["fcfs", "sjf", "rr"])
+def test_busy_time_is_total_burst_when_everything_finishes(sched, make_workload, record, algorithm, balance):
+    workload = make_workload(7, algorithm, jobs=20, runfor=400)
+    workload.arrivals = array("q", (arrival // 4 for arrival in workload.arrivals))
+    table = workload.table()
+    busy, _, _ = sched.smp_scheduler(table, workload.runfor, algorithm, workload.quantum, 3, balance, record()[1])
+
+    assert sched.UNSET not in table.finish
+    assert sum(busy) == sum(workload.bursts)
+
+
+@pytest.mark.parametrize("balance", BALANCES)
+@pytest.mark.parametrize("algorithm", ["fcfs", "sjf", "rr"])
+@pytest.mark.parametrize("seed", range(10))
+def test_one_cpu_matches_single_cpu_engine(sched, make_workload, record, seed, algorithm, balance):
+    workload = make_workload(seed, algorithm, jobs=12, runfor=80, quirks=True)
+    if algorithm == "rr":
+        # The single-CPU Round Robin engine stalls behind an arrival before 0
+        workload.arrivals = array("q", (max(arrival, 0) for arrival in workload.arrivals))
+    expected = sched.simulate_workload(workload, record()[1])
+    table = workload.table()
+    sched.smp_scheduler(table, workload.runfor, algorithm, workload.quantum, 1, balance, record()[1])
+
+    for column in ("start", "finish", "remaining"):
+        assert list(getattr(table, column)) == list(getattr(expected, column)), column
@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.mark.parametrize("jobs", [[("A", -1, 3)], [("A", 0, 3), ("B", -2, 1)]])
+def test_negative_arrival_is_rejected(sched, jobs):
+    with pytest.raises(ValueError, match="negative arrival"):
+        list(sched.stream_schedule(jobs, "fcfs"))
+
+
+def test_out_of_order_arrival_names_the_previous_job(sched):
+    with pytest.raises(ValueError, match="arrives at 1, before the previous job at 2"):
+        list(sched.stream_schedule([("A", 2, 3), ("B", 1, 1)], "fcfs"))
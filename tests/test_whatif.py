@@ -0,0 +1,59 @@
+import random
+from array import array
+
+import pytest
+
+COLUMNS = ("remaining", "start", "finish", "response")
+
+
+def full_run(sched, workload, changes, added, record):
+    """Applies the what-if changes to a copy of workload and simulates it from scratch."""
+    names = list(workload.names)
+    arrivals = array("q", workload.arrivals)
+    bursts = array("q", workload.bursts)
+    for job, change in changes.items():
+        if change is None:
+            arrivals[job] = workload.runfor  # never arrives, as WhatIf.remove does
+            continue
+        arrival, burst = change
+        if arrival is not None:
+            arrivals[job] = arrival
+        if burst is not None:
+            bursts[job] = burst
+    for name, arrival, burst in added:
+        names.append(name)
+        arrivals.append(arrival)
+        bursts.append(burst)
+    changed = sched.Workload(len(names), workload.runfor, workload.algorithm, workload.quantum, names, arrivals, bursts)
+    return sched.simulate_workload(changed, record()[1])
+
+
+def columns(table, removed):
+    return {column: [v for i, v in enumerate(getattr(table, column)) if i not in removed] for column in COLUMNS}
+
+
+@pytest.mark.parametrize("snapshot_every", [None, 1, 7])
+@pytest.mark.parametrize("algorithm", ["fcfs", "sjf", "rr"])
+@pytest.mark.parametrize("seed", range(8))
+def test_incremental_run_matches_full_run(sched, make_workload, record, seed, algorithm, snapshot_every):
+    workload = make_workload(seed, algorithm, jobs=25, runfor=250)
+    whatif = sched.WhatIf(workload, snapshot_every=snapshot_every)
+    rng = random.Random(seed)
+
+    for _ in range(6):
+        changes = {}
+        for _ in range(rng.randint(0, 2)):
+            job = rng.randrange(workload.process_count)
+            if rng.random() < 0.3:
+                changes[job] = None
+            else:
+                changes[job] = (rng.choice([None, rng.randrange(workload.runfor)]),
+                                rng.choice([None, rng.randint(1, 20)]))
+        added = []
+        if not changes or rng.random() < 0.4:
+            added.append((f"X{rng.randint(0, 9)}", rng.randrange(workload.runfor), rng.randint(1, 20)))
+
+        removed = {job for job, change in changes.items() if change is None}
+        got = whatif.simulate(changes, added)
+        expected = full_run(sched, workload, changes, added, record)
+        assert columns(got, removed) == columns(expected, removed), (changes, added)